@@ -0,0 +1,36 @@
+import argparse
+from typing import Optional, Sequence
+
+from aoc_py.runner import DAYS, format_memory, format_timings, load_day, time_day, trace_day
+from aoc_py.utils import default_input_path
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m aoc_py")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Solve a day and time parse, part1 and part2 separately.")
+    run_parser.add_argument("--day", type=int, required=True, choices=DAYS, metavar="DAY")
+    run_parser.add_argument("--input", help="Input file, defaults to aoc_py/aocDAY/in.txt.")
+    run_parser.add_argument("--repeat", type=int, default=1, help="Number of timed repetitions.")
+    run_parser.add_argument("--json", action="store_true", help="Emit one JSON line per phase.")
+    run_parser.add_argument(
+        "--memory", action="store_true", help="Trace the memory allocated by each phase instead of timing it."
+    )
+    run_parser.add_argument("--top", type=int, default=5, help="Number of allocation sites reported with --memory.")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        day = load_day(args.day)
+        source = args.input if args.input is not None else default_input_path(args.day)
+        if args.memory:
+            memory = trace_day(day, source, top=args.top)
+            print(format_memory(args.day, memory, as_json=args.json))
+        else:
+            timings = time_day(day, source, repeat=args.repeat)
+            print(format_timings(args.day, timings, as_json=args.json))
+
+
+if __name__ == "__main__":
+    main()
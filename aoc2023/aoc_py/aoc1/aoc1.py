@@ -1,29 +1,116 @@
+import mmap
 import os
 import string
 import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import numpy as np
+
+from aoc_py.utils import InputSource, read_input
+
+CHUNK_SIZE = 1 << 26
+
+
+def parse(source: InputSource) -> list[str]:
+    return [line.strip() for line in read_input(source).splitlines()]
+
+
+def part1(lines: list[str]) -> int:
+    sum = 0
+    for line in lines:
+        first, second = None, None
+
+        # Find first digit
+        for i in range(len(line)):
+            if line[i] in string.digits:
+                first = int(line[i])
+                break
+
+        # Find last digit
+        for i in range(len(line) - 1, -1, -1):
+            if line[i] in string.digits:
+                second = int(line[i])
+                break
+
+        # print(f"Found digits: {first}{second}")
+        sum += int(f"{first}{second}")
+    return sum
+
+
+@contextmanager
+def open_buffer(source: InputSource) -> Iterator[bytes | mmap.mmap]:
+    """Raw bytes of the input, memory-mapped when the input is a file."""
+    if isinstance(source, bytes):
+        yield source
+        return
+
+    with open(source, mode="rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def sum_chunk(chunk: np.ndarray) -> tuple[int, int, int]:
+    """Sum the calibration values of a chunk made of whole lines.
+
+    Returns:
+        tuple[int, int, int]: the sum, the number of lines and the number of lines with at least one digit.
+    """
+    # Bytes below "0" wrap around, so a single comparison finds the digits
+    digits = np.flatnonzero(chunk - np.uint8(ord("0")) < 10)
+    newlines = np.flatnonzero(chunk == ord("\n"))
+    n_lines = len(newlines) + int(chunk[-1] != ord("\n"))
+    if not len(digits):
+        return 0, n_lines, 0
+
+    # Digits are sorted, so the digits of each line are contiguous
+    line_idx = np.searchsorted(newlines, digits)
+    line_change = line_idx[1:] != line_idx[:-1]
+    firsts = digits[np.concatenate(([True], line_change))]
+    lasts = digits[np.concatenate((line_change, [True]))]
+    total = 10 * int(chunk[firsts].sum(dtype=np.int64)) + int(chunk[lasts].sum(dtype=np.int64))
+    return total - 11 * ord("0") * len(firsts), n_lines, len(firsts)
+
+
+def bulk_part1(source: InputSource, chunk_size: int = CHUNK_SIZE) -> int:
+    """Solve the first part straight from the raw input, without building a string per line.
+
+    The input is memory-mapped and scanned as a uint8 array in chunks of whole lines,
+    so memory stays bounded by the chunk size whatever the size of the input.
+
+    Args:
+        source (InputSource): a path to the input file or its raw content.
+        chunk_size (int): approximate number of bytes scanned at once.
+
+    Returns:
+        int: the sum of the calibration values.
+    """
+    total = 0
+    with open_buffer(source) as data:
+        start = 0
+        while start < len(data):
+            end = min(start + chunk_size, len(data))
+            if end < len(data):
+                # Cut after the last newline of the chunk, or of the first line if longer than the chunk
+                last_newline = data.rfind(b"\n", start, end)
+                end = last_newline + 1 if last_newline != -1 else data.find(b"\n", end) + 1 or len(data)
+
+            chunk = np.frombuffer(data, dtype=np.uint8, count=end - start, offset=start)
+            chunk_total, n_lines, n_lines_with_digits = sum_chunk(chunk)
+            del chunk  # Release the buffer before the file is unmapped
+            if n_lines_with_digits != n_lines:
+                raise ValueError(f"Found {n_lines - n_lines_with_digits} lines without digits.")
+
+            total += chunk_total
+            start = end
+    return total
+
 
 if __name__ == "__main__":
     t0 = time.perf_counter()
-    with open(os.path.join(os.path.dirname(__file__), "in.txt"), mode="r", encoding="utf-8") as file:
-        sum = 0
-        for line in file:
-            line = line.strip()
-            first, second = None, None
-
-            # Find first digit
-            for i in range(len(line)):
-                if line[i] in string.digits:
-                    first = int(line[i])
-                    break
-
-            # Find last digit
-            for i in range(len(line) - 1, -1, -1):
-                if line[i] in string.digits:
-                    second = int(line[i])
-                    break
-
-            # print(f"Found digits: {first}{second}")
-            sum += int(f"{first}{second}")
-
-        print(f"{sum=}")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds")
+    lines = parse(os.path.join(os.path.dirname(__file__), "in.txt"))
+    print(f"sum={part1(lines)}")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds")
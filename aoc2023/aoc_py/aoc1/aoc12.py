@@ -1,7 +1,9 @@
 import os
 import string
 import time
-from typing import Optional
+from typing import Iterable, Optional
+
+from aoc_py.aoc1.aoc1 import parse
 
 num_mapping = {
     "one": 1,
@@ -15,75 +17,103 @@ num_mapping = {
     "nine": 9,
 }
 
-num_reverse_mapping = {"".join(reversed(k)): v for k, v in num_mapping.items()}
-
 
-def find_matching_digits(s: str, i: int, reverse: bool) -> Optional[int]:
-    """Find first matching digit in string.
+def build_dfa(patterns: dict[str, int]) -> tuple[list[dict[str, int]], list[Optional[tuple[int, int]]]]:
+    """Build the Aho-Corasick automaton of the patterns as a DFA.
 
-    Find first matching digit in string starting from a given index.
-    This function can identify digits that are spelled out with letters.
-
-    Examples:
-        >>> find_matching_digits("xtwone3four", 0, reverse=False)
-        None
-        >>> find_matching_digits("xtwone3four", 1, reverse=False)
-        2
-        >>> find_matching_digits("xtwone3four", 10, reverse=True)
-        4
+    Failure links are resolved at build time, so scanning a character is a single dict lookup:
+    characters missing from a state transitions lead back to the root state 0.
 
     Args:
-        s (str): the string.
-        i (int): the starting index.
-        reverse (bool): whether to find a match from right to left.
+        patterns (dict[str, int]): patterns with the value returned when they match.
 
     Returns:
-        Optional[int]: matching digit, if found.
+        tuple[list[dict[str, int]], list[Optional[tuple[int, int]]]]: transitions of each state and, for each state,
+            the value and length of the longest pattern ending there.
     """
-    if s[i] in string.digits:
-        return int(s[i])
-
-    mapping = num_reverse_mapping if reverse else num_mapping
-    matching = list(mapping.keys())
-    matching_idx = 0
-    while True:
-        new_matching = []
-        for num_s in matching:
-            if matching_idx < len(num_s):
-                if num_s[matching_idx] == s[i + matching_idx * (-1 if reverse else 1)]:
-                    if len(num_s) - 1 == matching_idx:
-                        return mapping[num_s]
-                    new_matching.append(num_s)
-
-        matching = new_matching
-        matching_idx += 1
-        if not matching:
-            return None
+    goto: list[dict[str, int]] = [{}]
+    outputs: list[Optional[tuple[int, int]]] = [None]
+    for pattern, value in patterns.items():
+        state = 0
+        for ch in pattern:
+            if ch not in goto[state]:
+                goto.append({})
+                outputs.append(None)
+                goto[state][ch] = len(goto) - 1
+            state = goto[state][ch]
+        outputs[state] = (value, len(pattern))
+
+    # Breadth first, so that the failure state of each state is completed before the state itself
+    delta: list[dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+    fail = [0] * len(goto)
+    queue = list(goto[0].values())
+    for state in queue:
+        fail_state = fail[state]
+        delta[state] = {**delta[fail_state], **goto[state]}
+        state_output, fail_output = outputs[state], outputs[fail_state]
+        if fail_output is not None and (state_output is None or state_output[1] < fail_output[1]):
+            outputs[state] = fail_output
+        for ch, next_state in goto[state].items():
+            fail[next_state] = delta[fail_state].get(ch, 0)
+            queue.append(next_state)
+
+    return delta, outputs
+
+
+class DigitAutomaton:
+    """Multi-pattern scanner finding the first and the last match in a string with a single pass each.
+
+    Examples:
+        >>> automaton = DigitAutomaton(num_mapping)
+        >>> automaton.find_first("xtwone3four"), automaton.find_last("xtwone3four")
+        (2, 4)
+    """
+
+    def __init__(self, patterns: dict[str, int]) -> None:
+        self.max_len = max(len(pattern) for pattern in patterns)
+        self.forward, self.forward_outputs = build_dfa(patterns)
+        # The last match is the first match of the reversed patterns in the reversed string
+        self.backward, self.backward_outputs = build_dfa({pattern[::-1]: v for pattern, v in patterns.items()})
+
+    @staticmethod
+    def _scan(
+        chars: Iterable[str], delta: list[dict[str, int]], outputs: list[Optional[tuple[int, int]]], max_len: int
+    ) -> Optional[int]:
+        best_start, best_value = -1, None
+        state = 0
+        for i, ch in enumerate(chars):
+            state = delta[state].get(ch, 0)
+            output = outputs[state]
+            if output is not None and (best_value is None or i - output[1] + 1 < best_start):
+                best_value, best_start = output[0], i - output[1] + 1
+            if best_value is not None and i - best_start + 1 >= max_len:
+                # Patterns ending later cannot start earlier
+                break
+        return best_value
+
+    def find_first(self, s: str) -> Optional[int]:
+        return self._scan(s, self.forward, self.forward_outputs, self.max_len)
+
+    def find_last(self, s: str) -> Optional[int]:
+        return self._scan(reversed(s), self.backward, self.backward_outputs, self.max_len)
+
+
+DIGIT_AUTOMATON = DigitAutomaton({**num_mapping, **{digit: int(digit) for digit in string.digits}})
+
+
+def part2(lines: list[str]) -> int:
+    sum = 0
+    for line in lines:
+        first = DIGIT_AUTOMATON.find_first(line)
+        second = DIGIT_AUTOMATON.find_last(line)
+        if first is None or second is None:
+            raise ValueError(f"Cannot find digits in {line}.")
+        sum += 10 * first + second
+    return sum
 
 
 if __name__ == "__main__":
     t0 = time.perf_counter()
-    with open(os.path.join(os.path.dirname(__file__), "in.txt"), mode="r", encoding="utf-8") as file:
-        sum = 0
-        for line in file:
-            line = line.strip()
-            first, second = None, None
-
-            # Find first digit
-            for i in range(len(line)):
-                match = find_matching_digits(line, i, reverse=False)
-                if match is not None:
-                    first = match
-                    break
-
-            # Find last digit
-            for i in range(len(line) - 1, -1, -1):
-                match = find_matching_digits(line, i, reverse=True)
-                if match is not None:
-                    second = match
-                    break
-
-            sum += int(f"{first}{second}")
-
-        print(f"{sum=}")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds")
+    lines = parse(os.path.join(os.path.dirname(__file__), "in.txt"))
+    print(f"sum={part2(lines)}")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds")
@@ -1,208 +1,141 @@
-import heapq
 import os
 import time
-from dataclasses import dataclass, field
-from typing import Optional, Self
-
-
-@dataclass(frozen=True, slots=True, order=True)
-class Node:
-    symbol: str = field(compare=False)
-    row_idx: int = field(compare=False)
-    col_idx: int = field(compare=False)
-    cost: int
-    father: Optional[Self] = field(compare=False, default=None, repr=False)
-
-    @classmethod
-    def new(cls, row_idx: int, col_idx: int, cost: int, father: Optional[Self], tiles: list[list[str]]) -> Self:
-        return cls(
-            symbol=tiles[row_idx][col_idx],
-            row_idx=row_idx,
-            col_idx=col_idx,
-            father=father,
-            cost=cost,
-        )
-
-
-def is_valid_tile(row_idx: int, col_idx: int, tiles: list[list[str]]) -> bool:
-    return 0 <= row_idx < len(tiles) and 0 <= col_idx < len(tiles[0])
-
-
-def expand_node(node: Node, tiles: list[list[str]], visited: list[list[bool]]) -> list[Node]:
-    expanded = []
-    for d_row, d_col in [(0, 1), (1, 0), (1, 1), (-1, 0), (0, -1), (-1, -1), (-1, 1), (1, -1)]:
-        if (
-            is_valid_tile(node.row_idx + d_row, node.col_idx + d_col, tiles)
-            and not visited[node.row_idx + d_row][node.col_idx + d_col]
-        ):
-            target_symbol = tiles[node.row_idx + d_row][node.col_idx + d_col]
-            if target_symbol == "." or target_symbol == "S":
-                continue
-
-            if (
-                target_symbol == "|"
-                and (d_row, d_col) in {(-1, 0), (1, 0)}
-                or target_symbol == "-"
-                and (d_row, d_col) in {(0, 1), (0, -1)}
-                or target_symbol == "L"
-                and (d_row, d_col) in {(1, 0), (0, -1)}
-                or target_symbol == "J"
-                and (d_row, d_col) in {(1, 0), (0, 1)}
-                or target_symbol == "7"
-                and (d_row, d_col) in {(-1, 0), (0, 1)}
-                or target_symbol == "F"
-                and (d_row, d_col) in {(-1, 0), (0, -1)}
-            ):
-                expanded_node = Node.new(
-                    row_idx=node.row_idx + d_row,
-                    col_idx=node.col_idx + d_col,
-                    cost=node.cost + 1,
-                    father=node,
-                    tiles=tiles,
-                )
-                expanded.append(expanded_node)
-
-    return expanded
-
-
-def count_internal(loop: list[list[bool]], tiles: list[list[str]]) -> int:
+from array import array
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from aoc_py.grid import Grid
+from aoc_py.utils import InputSource
+
+NORTH, EAST, SOUTH, WEST = 1, 2, 4, 8
+STEPS = {NORTH: (-1, 0), EAST: (0, 1), SOUTH: (1, 0), WEST: (0, -1)}
+OPPOSITE = {NORTH: SOUTH, EAST: WEST, SOUTH: NORTH, WEST: EAST}
+PIPES = {
+    "|": NORTH | SOUTH,
+    "-": EAST | WEST,
+    "L": NORTH | EAST,
+    "J": NORTH | WEST,
+    "7": SOUTH | WEST,
+    "F": SOUTH | EAST,
+}
+PIPE_SYMBOLS = {connections: symbol for symbol, connections in PIPES.items()}
+# Directions connected by each byte of the maze, 0 for anything but a pipe
+CONNECTIONS = [PIPES.get(chr(byte), 0) for byte in range(256)]
+NORTH_CONNECTED = np.array([bool(connections & NORTH) for connections in CONNECTIONS])
+SOUTH_CONNECTED = np.array([bool(connections & SOUTH) for connections in CONNECTIONS])
+
+
+@dataclass(frozen=True, slots=True)
+class Loop:
+    """Tiles of the loop in the order they are visited from the start tile, which comes first."""
+
+    rows: np.ndarray
+    cols: np.ndarray
+    start_symbol: str
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def mask(self, shape: tuple[int, int]) -> np.ndarray:
+        mask = np.zeros(shape, dtype=bool)
+        mask[self.rows, self.cols] = True
+        return mask
+
+    def farthest_distance(self) -> int:
+        return len(self) // 2
+
+    def enclosed_count(self) -> int:
+        """Tiles enclosed by the loop, from its area with the shoelace formula and Pick's theorem.
+
+        The loop is a polygon through the centres of its tiles: its vertices are lattice points, its boundary
+        has len(self) of them and the enclosed tiles are the lattice points inside.
+        """
+        rows, cols = self.rows.astype(np.int64), self.cols.astype(np.int64)
+        double_area = abs(int(np.dot(cols, np.roll(rows, -1)) - np.dot(np.roll(cols, -1), rows)))
+        return (double_area - len(self)) // 2 + 1
+
+
+def follow_pipes(start: tuple[int, int], heading: int, tiles: Grid) -> Optional[Loop]:
+    """Walk the pipes leaving the start tile towards heading, None if they do not lead back to the start."""
+    data, stride, n_rows, n_cols = tiles.data, tiles.stride, tiles.n_rows, tiles.n_cols
+    start_row, start_col = start
+    rows, cols = array("i", [start_row]), array("i", [start_col])
+    first_heading = heading
+    row, col = start
+    while True:
+        d_row, d_col = STEPS[heading]
+        row, col = row + d_row, col + d_col
+        if not (0 <= row < n_rows and 0 <= col < n_cols):
+            return None
+        back = OPPOSITE[heading]
+        if row == start_row and col == start_col:
+            return Loop(
+                rows=np.frombuffer(rows, dtype=np.int32),
+                cols=np.frombuffer(cols, dtype=np.int32),
+                start_symbol=PIPE_SYMBOLS[first_heading | back],
+            )
+        connections = CONNECTIONS[data[row * stride + col]]
+        if not connections & back:
+            return None
+        rows.append(row)
+        cols.append(col)
+        heading = connections ^ back
+
+
+def trace_loop(start: tuple[int, int], tiles: Grid) -> Loop:
+    """Find the loop through the start tile, whose pipe is deduced from the ends of the loop."""
+    # Pipes always have two ends, so from a given heading the walk can only close on the start tile or break
+    for heading in STEPS:
+        if (loop := follow_pipes(start, heading, tiles)) is not None:
+            return loop
+    raise ValueError("The starting tile is not on a loop.")
+
+
+def interior_mask(loop_mask: np.ndarray, tiles: Grid) -> np.ndarray:
+    """Tiles enclosed by the loop, as a boolean array shaped like the grid.
+
+    Going right along a row from outside the loop, every loop tile connected to the north (|, L and J) switches
+    between outside and inside: the row-wise cumulative XOR of these tiles is the parity of every tile.
+    F and 7 tiles only ever come in pairs with the J or L ending the same horizontal stretch, so they can be skipped.
+    The S tile connects to the north when the loop tile above it connects to the south.
     """
-    Solved noticing the following property:
-        If we start at a enclosed tile and move right we encounter an odd number of | tiles (called fulls below).
-        We may also encounter border tiles (e.g., F and 7) which we don't have to count.
+    cells = tiles.array
+    is_north = loop_mask & NORTH_CONNECTED[cells]
+    is_start = loop_mask & (cells == ord("S"))
+    is_start[1:] &= (loop_mask & SOUTH_CONNECTED[cells])[:-1]
+    is_start[0] = False
+    parity = np.logical_xor.accumulate(is_north | is_start, axis=1)
+    return parity & ~loop_mask
 
-    The property above must be satisfied when moving from left to right, from right to left, from bottom to top
-    and from top to bottom starting from each enclosed tile. (for bottom-top and top-bottom movements full tiles are -)
 
-    Code below assumes the S tile has been replaced properly.
-    """
-    count = 0
-    for row_idx in range(len(tiles)):
-        for col_idx in range(len(tiles[0])):
-            if not loop[row_idx][col_idx]:
-                r_border, r_full = 0, 0
-                l_border, l_full = 0, 0
-                t_border, t_full = 0, 0
-                b_border, b_full = 0, 0
-
-                # Right
-                for i in range(col_idx, len(tiles[0])):
-                    if loop[row_idx][i] and tiles[row_idx][i] in {"F", "7"}:
-                        r_border += 1
-                    elif loop[row_idx][i] and tiles[row_idx][i] in {"|", "J", "L"}:
-                        r_full += 1
-
-                # Left
-                for i in range(col_idx, -1, -1):
-                    if loop[row_idx][i] and tiles[row_idx][i] in {"F", "7"}:
-                        l_border += 1
-                    elif loop[row_idx][i] and tiles[row_idx][i] in {
-                        "|",
-                        "J",
-                        "L",
-                    }:
-                        l_full += 1
-
-                # Bottom
-                for i in range(row_idx, len(tiles)):
-                    if loop[i][col_idx] and tiles[i][col_idx] in {"L", "F"}:
-                        b_border += 1
-                    elif loop[i][col_idx] and tiles[i][col_idx] in {"-", "7", "J"}:
-                        b_full += 1
-
-                # Top
-                for i in range(row_idx, -1, -1):
-                    if loop[i][col_idx] and tiles[i][col_idx] in {"L", "F"}:
-                        t_border += 1
-                    elif loop[i][col_idx] and tiles[i][col_idx] in {"-", "7", "J"}:
-                        t_full += 1
-
-                check_r = r_full > 0 and r_full % 2 != 0
-                check_l = l_full > 0 and l_full % 2 != 0
-                check_b = b_full > 0 and b_full % 2 != 0
-                check_t = t_full > 0 and t_full % 2 != 0
-
-                if check_r and check_l and check_b and check_t:
-                    # Tile enclosed in the loop
-                    count += 1
-    return count
-
-
-def solve(start: tuple[int, int], tiles: list[list[str]]) -> tuple[int, int]:
-    visited = [[False for _ in range(len(tiles[0]))] for _ in range(len(tiles))]
-
-    curr = Node.new(row_idx=start[0], col_idx=start[1], cost=0, father=None, tiles=tiles)
-    prio_queue = [curr]
-    prev_curr = None
-    max_cost = -1
-
-    while prio_queue:
-        curr = heapq.heappop(prio_queue)
-        max_cost = max(max_cost, curr.cost)
-        visited[curr.row_idx][curr.col_idx] = True
-
-        expanded_nodes = expand_node(curr, tiles, visited)
-        for node in expanded_nodes:
-            heapq.heappush(prio_queue, node)
-
-        if prio_queue:
-            prev_curr = curr
-
-    # Identify loop
-    loop = [[False for _ in range(len(tiles[0]))] for _ in range(len(tiles))]
-    assert curr is not None and prev_curr is not None, "Type guard"
-    for node in [curr, prev_curr]:
-        n: Optional[Node] = node
-        while n is not None:
-            loop[n.row_idx][n.col_idx] = True
-            n = n.father
-
-    # All the lines below just to identify the S tile
-    # with its corresponding standard tile
-    nodes_after_start_point = []
-    for node in [curr, prev_curr]:
-        n = node
-        while n.father is not None:
-            n = n.father
-            assert n.father is not None, "Type guard"
-            if n.father.symbol == "S":
-                nodes_after_start_point.append(n)
-                break
-
-    diffs_to_target_symbol: dict[tuple[tuple[int, int], ...], str] = {
-        ((-1, 0), (1, 0)): "|",
-        ((0, 1), (0, -1)): "-",
-        ((1, 0), (0, -1)): "L",
-        ((1, 0), (0, 1)): "J",
-        ((-1, 0), (0, 1)): "7",
-        ((-1, 0), (0, -1)): "F",
-    }
-    diffs_to_target_symbol = {tuple(sorted(k)): v for k, v in diffs_to_target_symbol.items()}
-    diffs: list[tuple[int, int]] = []
-    for node in nodes_after_start_point:
-        diffs.append((start[0] - node.row_idx, start[1] - node.col_idx))
-
-    s_replace_symbol = diffs_to_target_symbol[tuple(sorted(diffs))]
-    print(f"Replacing starting symbol S with {s_replace_symbol} for second part.")
-    tiles[start[0]][start[1]] = s_replace_symbol
-
-    # Having replaced S with a normal tile, we can now solve part2
-    count = count_internal(loop, tiles)
-
-    return max_cost, count
+def solve(start: tuple[int, int], tiles: Grid) -> tuple[int, int]:
+    loop = trace_loop(start, tiles)
+    return loop.farthest_distance(), loop.enclosed_count()
+
+
+def parse(source: InputSource) -> tuple[tuple[int, int], Grid]:
+    tiles = Grid.load(source)
+    start = tiles.find("S")
+    if start is None:
+        raise ValueError("The maze has no starting tile.")
+    return start, tiles
+
+
+def part1(maze: tuple[tuple[int, int], Grid]) -> int:
+    return trace_loop(*maze).farthest_distance()
+
+
+def part2(maze: tuple[tuple[int, int], Grid]) -> int:
+    return trace_loop(*maze).enclosed_count()
 
 
 if __name__ == "__main__":
     t0 = time.perf_counter()
-    with open(os.path.join(os.path.dirname(__file__), "in.txt"), mode="r", encoding="utf-8") as f:
-        tiles = []
-        start = (0, 0)
-        for line in f:
-            tiles.append([ch for ch in line.strip()])
-            if (col_idx := line.find("S")) != -1:
-                start = (len(tiles) - 1, col_idx)
-
-        first_res, second_res = solve(start, tiles)
-        print(f"First part solution = {first_res}")
-        print(f"Secoond part solution = {second_res}")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds")
+    start, tiles = parse(os.path.join(os.path.dirname(__file__), "in.txt"))
+
+    first_res, second_res = solve(start, tiles)
+    print(f"First part solution = {first_res}")
+    print(f"Secoond part solution = {second_res}")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds")
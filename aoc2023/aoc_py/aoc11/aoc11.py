@@ -1,84 +1,134 @@
+import io
 import os
 import time
+from array import array
+from dataclasses import dataclass
+from typing import Self
+
+import numpy as np
+
+from aoc_py.utils import InputSource
+
+INT64_MAX = np.iinfo(np.int64).max
+
+
+def pairwise_distance_sum(values: np.ndarray) -> int:
+    """Sum of |values[i] - values[j]| over all pairs i < j of sorted non-negative values.
+
+    Once sorted, values[k] is subtracted from the k values after it and the k values before are subtracted from it.
+    """
+    n = len(values)
+    if not n:
+        return 0
+    factors = 2 * np.arange(n, dtype=np.int64) - (n - 1)
+    if int(values[-1]) * n * n <= INT64_MAX:
+        return int(np.dot(values.astype(np.int64), factors))
+    return sum(value * factor for value, factor in zip(values.tolist(), factors.tolist()))
+
+
+@dataclass(frozen=True, slots=True)
+class DistanceSum:
+    """Sum of the distances between all the pairs of galaxies, as base + expansion * (multiplier - 1).
+
+    A galaxy at position p moves by (multiplier - 1) for every empty line before it, so along an axis its
+    expanded position is p + e * (multiplier - 1) with e the prefix count of empty lines. Sorting by p also
+    sorts e, so the distances of the positions and of the prefix counts can be summed separately.
+    """
+
+    base: int
+    expansion: int
+
+    @classmethod
+    def from_axes(cls, axes: list[tuple[np.ndarray, np.ndarray]]) -> Self:
+        """Build from the (positions, empty lines before) of the galaxies along each axis."""
+        base, expansion = 0, 0
+        for positions, empty_before in axes:
+            # Both grow together, so sorting them separately keeps the galaxies aligned
+            base += pairwise_distance_sum(np.sort(positions))
+            expansion += pairwise_distance_sum(np.sort(empty_before))
+        return cls(base=base, expansion=expansion)
+
+    @classmethod
+    def from_universe(cls, universe: "Universe") -> Self:
+        return cls.from_axes(
+            [(universe.rows, universe.empty_rows_before), (universe.cols, universe.empty_cols_before())]
+        )
+
+    def at(self, expansion_multiplier: int) -> int:
+        return self.base + self.expansion * (expansion_multiplier - 1)
 
 
 def solve(
     *, galaxies: list[tuple[int, int]], expansion_multiplier: int, row_expansions: set[int], col_expansions: set[int]
 ) -> int:
-    sum = 0
-    for galaxy_idx, galaxy in enumerate(galaxies):
-        for other_galaxy in galaxies[galaxy_idx + 1 :]:
-            pos_row = galaxy[0]
-            pos_col = galaxy[1]
-            delta_row = other_galaxy[0] - galaxy[0]
-            delta_col = other_galaxy[1] - galaxy[1]
-            n_steps = 0
-
-            i = 1
-            while delta_row and i <= abs(delta_row):
-                check_row = pos_row + i * (-1 if delta_row < 0 else +1)
-                n_steps += 1 * (expansion_multiplier if check_row in row_expansions else 1)
-                i += 1
-
-            j = 1
-            while delta_col and j <= abs(delta_col):
-                check_col = pos_col + j * (-1 if delta_col < 0 else +1)
-                n_steps += 1 * (expansion_multiplier if check_col in col_expansions else 1)
-                j += 1
-
-            sum += n_steps
-    return sum
+    positions = np.array(galaxies, dtype=np.int64).reshape(-1, 2)
+    axes = []
+    for axis, expansions in enumerate((row_expansions, col_expansions)):
+        empty_lines = np.sort(np.array(list(expansions), dtype=np.int64))
+        axes.append((positions[:, axis], np.searchsorted(empty_lines, positions[:, axis])))
+    return DistanceSum.from_axes(axes).at(expansion_multiplier)
+
+
+@dataclass(slots=True)
+class Universe:
+    """Galaxies of the image in row-major order, with the number of empty rows above each of them."""
+
+    rows: np.ndarray
+    cols: np.ndarray
+    empty_rows_before: np.ndarray
+    occupied_cols: np.ndarray
+
+    def empty_cols_before(self) -> np.ndarray:
+        # Galaxy columns are occupied, so the inclusive count of empty columns is the count before them
+        return np.cumsum(~self.occupied_cols)[self.cols]
+
+
+def parse(source: InputSource) -> Universe:
+    """Stream the image one line at a time, keeping only the galaxies and a bitmap of the occupied columns."""
+    rows, cols, empty_rows_before = array("q"), array("q"), array("q")
+    occupied_cols = np.zeros(0, dtype=bool)
+    n_empty_rows = 0
+    with io.BytesIO(source) if isinstance(source, bytes) else open(source, mode="rb") as f:
+        for row_idx, line in enumerate(f):
+            cells = np.frombuffer(line.rstrip(b"\r\n"), dtype=np.uint8)
+            if not row_idx:
+                occupied_cols = np.zeros(len(cells), dtype=bool)
+            elif len(cells) != len(occupied_cols):
+                raise ValueError("All the rows of the image must have the same length.")
+
+            galaxy_cols = np.flatnonzero(cells == ord("#"))
+            if not len(galaxy_cols):
+                n_empty_rows += 1
+                continue
+            occupied_cols[galaxy_cols] = True
+            cols.frombytes(galaxy_cols.astype(np.int64).tobytes())
+            rows.extend([row_idx] * len(galaxy_cols))
+            empty_rows_before.extend([n_empty_rows] * len(galaxy_cols))
+
+    return Universe(
+        rows=np.frombuffer(rows, dtype=np.int64),
+        cols=np.frombuffer(cols, dtype=np.int64),
+        empty_rows_before=np.frombuffer(empty_rows_before, dtype=np.int64),
+        occupied_cols=occupied_cols,
+    )
+
+
+def part1(universe: Universe) -> int:
+    return DistanceSum.from_universe(universe).at(2)
+
+
+def part2(universe: Universe) -> int:
+    return DistanceSum.from_universe(universe).at(int(1e6))
 
 
 if __name__ == "__main__":
     t0 = time.perf_counter()
+    universe = parse(os.path.join(os.path.dirname(__file__), "in.txt"))
 
-    with open(os.path.join(os.path.dirname(__file__), "in.txt"), mode="r", encoding="utf-8") as f:
-        universe = []
-        galaxies = []
-        row_expansions = set()
-        col_expansions = set()
-
-        for line in f:
-            line = line.strip()
-            universe.append([ch for ch in line])
-
-        for i in range(len(universe)):
-            found_galaxy = False
-            for j in range(len(universe[0])):
-                if universe[i][j] == "#":
-                    found_galaxy = True
-                    break
-
-            if not found_galaxy:
-                row_expansions.add(i)
-
-        for j in range(len(universe[0])):
-            found_galaxy = False
-            for i in range(len(universe)):
-                if universe[i][j] == "#":
-                    found_galaxy = True
-                    break
-
-            if not found_galaxy:
-                col_expansions.add(j)
-
-        for i in range(len(universe)):
-            for j in range(len(universe[0])):
-                if universe[i][j] == "#":
-                    galaxies.append((i, j))
-
-        first_part_solution = solve(
-            galaxies=galaxies, expansion_multiplier=2, row_expansions=row_expansions, col_expansions=col_expansions
-        )
-        print(f"Part one solution = {first_part_solution}")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds")
-
-        second_part_solution = solve(
-            galaxies=galaxies,
-            expansion_multiplier=int(1e6),
-            row_expansions=row_expansions,
-            col_expansions=col_expansions,
-        )
-        print(f"Part two solution = {second_part_solution}")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds")
+    first_part_solution = part1(universe)
+    print(f"Part one solution = {first_part_solution}")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds")
+
+    second_part_solution = part2(universe)
+    print(f"Part two solution = {second_part_solution}")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds")
@@ -2,6 +2,8 @@ import os
 import time
 from typing import Optional, TypeVar
 
+from aoc_py.utils import InputSource, read_input
+
 T = TypeVar("T")
 
 
@@ -104,28 +106,45 @@ def solve(records: list[list[str]], damaged_groups: list[list[int]], verbose: bo
     return total
 
 
-if __name__ == "__main__":
-    N = 5
+def parse(source: InputSource) -> tuple[list[list[str]], list[list[int]]]:
+    records = []
+    damaged_groups = []
 
-    t0 = time.perf_counter()
-    with open(os.path.join(os.path.dirname(__file__), "in.txt"), mode="r", encoding="utf-8") as f:
-        records = []
-        damaged_groups = []
+    for line in read_input(source).splitlines():
+        new_record, new_group = line.strip().split(" ")
+        records.append([ch for ch in new_record])
+        damaged_groups.append([int(x) for x in new_group.split(",")])
 
-        for line in f:
-            new_record, new_group = line.strip().split(" ")
-            records.append([ch for ch in new_record])
-            damaged_groups.append([int(x) for x in new_group.split(",")])
+    return records, damaged_groups
 
-        t0 = time.perf_counter()
-        first_part_solution = solve(records, damaged_groups)
-        print(f"First part solution = {first_part_solution}")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds")
 
-        records = [el[:-1] for el in [flatten([r + ["?"] for _ in range(N)]) for r in records]]
-        damaged_groups = [flatten([g for _ in range(N)]) for g in damaged_groups]
+def unfold(
+    records: list[list[str]], damaged_groups: list[list[int]], n: int = 5
+) -> tuple[list[list[str]], list[list[int]]]:
+    unfolded_records = [el[:-1] for el in [flatten([r + ["?"] for _ in range(n)]) for r in records]]
+    unfolded_groups = [flatten([g for _ in range(n)]) for g in damaged_groups]
+    return unfolded_records, unfolded_groups
 
-        t0 = time.perf_counter()
-        first_part_solution = solve(records, damaged_groups, verbose=True)
-        print(f"Second part solution = {first_part_solution}")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds")
+
+def part1(springs: tuple[list[list[str]], list[list[int]]]) -> int:
+    return solve(*springs)
+
+
+def part2(springs: tuple[list[list[str]], list[list[int]]]) -> int:
+    return solve(*unfold(*springs))
+
+
+if __name__ == "__main__":
+    records, damaged_groups = parse(os.path.join(os.path.dirname(__file__), "in.txt"))
+
+    t0 = time.perf_counter()
+    first_part_solution = solve(records, damaged_groups)
+    print(f"First part solution = {first_part_solution}")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds")
+
+    records, damaged_groups = unfold(records, damaged_groups)
+
+    t0 = time.perf_counter()
+    first_part_solution = solve(records, damaged_groups, verbose=True)
+    print(f"Second part solution = {first_part_solution}")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds")
@@ -5,6 +5,11 @@ from typing import Literal, Optional
 
 import numpy as np
 
+from aoc_py.grid import Grid
+from aoc_py.utils import InputSource, read_input
+
+ROCK, ASH = ord("#"), ord(".")
+
 
 @dataclass(frozen=True, slots=True)
 class Solution:
@@ -40,7 +45,7 @@ def solve_pattern(pattern: np.ndarray, original_solution: Optional[Solution] = N
             if np.sum(diff) == 1:
                 diff_idx = np.argwhere(diff)[0][1]
                 curr_symbol = pattern[i, diff_idx]
-                changed_symbol = "#" if curr_symbol == "." else "."
+                changed_symbol = ROCK if curr_symbol == ASH else ASH
                 pattern[i, diff_idx] = changed_symbol
                 pattern[j, diff_idx] = changed_symbol
             else:
@@ -51,7 +56,7 @@ def solve_pattern(pattern: np.ndarray, original_solution: Optional[Solution] = N
                 if np.sum(external_diff) == 1:
                     diff_idx = np.argwhere(external_diff)[0]
                     curr_symbol = pattern[j + 1 + diff_idx[0], diff_idx[1]]
-                    changed_symbol = "#" if curr_symbol == "." else "."
+                    changed_symbol = ROCK if curr_symbol == ASH else ASH
                     pattern[j + 1 + diff_idx[0], diff_idx[1]] = changed_symbol
 
             row_start = pattern[i, :].reshape(-1, pattern.shape[1])
@@ -102,7 +107,7 @@ def solve_pattern(pattern: np.ndarray, original_solution: Optional[Solution] = N
             if np.sum(diff) == 1:
                 diff_idx = np.argwhere(diff)[0][0]
                 curr_symbol = pattern[diff_idx, i]
-                changed_symbol = "#" if curr_symbol == "." else "."
+                changed_symbol = ROCK if curr_symbol == ASH else ASH
                 pattern[diff_idx, i] = changed_symbol
                 pattern[diff_idx, j] = changed_symbol
             else:
@@ -113,7 +118,7 @@ def solve_pattern(pattern: np.ndarray, original_solution: Optional[Solution] = N
                 if np.sum(external_diff) == 1:
                     diff_idx = np.argwhere(external_diff)[0]
                     curr_symbol = pattern[diff_idx[0], j + 1 + diff_idx[1]]
-                    changed_symbol = "#" if curr_symbol == "." else "."
+                    changed_symbol = ROCK if curr_symbol == ASH else ASH
                     pattern[diff_idx[0], j + 1 + diff_idx[1]] = changed_symbol
 
             col_start = pattern[:, i].reshape(pattern.shape[0], -1)
@@ -168,9 +173,23 @@ def second_part_solution(patterns: list[np.ndarray], original_solutions: list[So
     return total, solutions
 
 
-with open(os.path.join(os.path.dirname(__file__), "in.txt"), mode="r", encoding="utf-8") as f:
+def parse(source: InputSource) -> list[Grid]:
+    return [Grid.from_lines(pattern.split("\n")) for pattern in read_input(source).strip().split("\n\n")]
+
+
+def part1(patterns: list[Grid]) -> int:
+    # solve_pattern may flip symbols in place, work on copies
+    return first_part_solution([pattern.array.copy() for pattern in patterns])[0]
+
+
+def part2(patterns: list[Grid]) -> int:
+    _, solutions = first_part_solution([pattern.array.copy() for pattern in patterns])
+    return second_part_solution([pattern.array.copy() for pattern in patterns], solutions)[0]
+
+
+if __name__ == "__main__":
     t0 = time.perf_counter()
-    patterns = [np.array([[ch for ch in line] for line in pattern.split("\n")]) for pattern in f.read().split("\n\n")]
+    patterns = [pattern.array for pattern in parse(os.path.join(os.path.dirname(__file__), "in.txt"))]
 
     first_part_res, solutions = first_part_solution(patterns)
     print(f"First part solution = {first_part_res}.")
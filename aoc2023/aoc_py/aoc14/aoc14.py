@@ -1,99 +1,71 @@
-import copy
 import os
 import time
 
-# The tilt functions below could be optimized
+import numpy as np
 
+from aoc_py.grid import Grid
+from aoc_py.utils import InputSource
 
-def tilt_east(platform: list[list[str]]) -> list[list[str]]:
-    moved = True
 
-    while moved:
-        moved = False
-        for j in range(len(platform) - 1):
-            for i in range(len(platform)):
-                if platform[i][j] == "O" and platform[i][j + 1] not in {"#", "O"}:
-                    platform[i][j] = "."
-                    platform[i][j + 1] = "O"
-                    moved = True
+def roll(line: bytes, towards_start: bool) -> bytes:
+    """Roll the rounded rocks of a row or column, each segment between cube rocks is rebuilt at once."""
+    segments = []
+    for segment in line.split(b"#"):
+        n_rocks = segment.count(b"O")
+        rocks, empty = b"O" * n_rocks, b"." * (len(segment) - n_rocks)
+        segments.append(rocks + empty if towards_start else empty + rocks)
+    return b"#".join(segments)
 
-    return platform
-
-
-def tilt_west(platform: list[list[str]]) -> list[list[str]]:
-    moved = True
-
-    while moved:
-        moved = False
-        for j in range(len(platform[0]) - 1, 0, -1):
-            for i in range(len(platform)):
-                if platform[i][j] == "O" and platform[i][j - 1] not in {"#", "O"}:
-                    platform[i][j] = "."
-                    platform[i][j - 1] = "O"
-                    moved = True
 
+def tilt_east(platform: Grid) -> Grid:
+    for i in range(platform.n_rows):
+        platform.set_row(i, roll(platform.row(i), towards_start=False))
     return platform
 
 
-def tilt_south(platform: list[list[str]]) -> list[list[str]]:
-    moved = True
-
-    while moved:
-        moved = False
-        for i in range(len(platform) - 1):
-            for j in range(len(platform)):
-                if platform[i][j] == "O" and platform[i + 1][j] not in {"#", "O"}:
-                    platform[i][j] = "."
-                    platform[i + 1][j] = "O"
-                    moved = True
-
+def tilt_west(platform: Grid) -> Grid:
+    for i in range(platform.n_rows):
+        platform.set_row(i, roll(platform.row(i), towards_start=True))
     return platform
 
 
-def tilt_north(platform: list[list[str]]) -> list[list[str]]:
-    moved = True
+def tilt_south(platform: Grid) -> Grid:
+    for j in range(platform.n_cols):
+        platform.set_col(j, roll(platform.col(j), towards_start=False))
+    return platform
 
-    while moved:
-        moved = False
-        for i in range(len(platform) - 1, 0, -1):
-            for j in range(len(platform[0])):
-                if platform[i][j] == "O" and platform[i - 1][j] not in {"#", "O"}:
-                    platform[i][j] = "."
-                    platform[i - 1][j] = "O"
-                    moved = True
 
+def tilt_north(platform: Grid) -> Grid:
+    for j in range(platform.n_cols):
+        platform.set_col(j, roll(platform.col(j), towards_start=True))
     return platform
 
 
-def tilt_cycle(platform: list[list[str]]) -> list[list[str]]:
-    copy_platform = copy.deepcopy(platform)
-    return tilt_east(tilt_south(tilt_west(tilt_north(copy_platform))))
+def tilt_cycle(platform: Grid) -> Grid:
+    return tilt_east(tilt_south(tilt_west(tilt_north(platform.copy()))))
 
 
-def compute_load(platform: list[list[str]]) -> int:
-    total = 0
-    for i in range(len(platform)):
-        for j in range(len(platform[0])):
-            if platform[i][j] == "O":
-                total += len(platform) - i
-    return total
+def compute_load(platform: Grid) -> int:
+    # A rock on row i weighs n_rows - i
+    rocks_per_row = (platform.array == ord("O")).sum(axis=1)
+    return int(rocks_per_row @ np.arange(platform.n_rows, 0, -1))
 
 
-def first_part_solution(platform: list[list[str]]) -> int:
+def first_part_solution(platform: Grid) -> int:
     tilted_platform = tilt_north(platform)
     return compute_load(tilted_platform)
 
 
-def get_previously_visited_idx(platform: list[list[str]], previously_visited_platforms: list[list[list[str]]]) -> int:
+def get_previously_visited_idx(platform: Grid, previously_visited_platforms: list[Grid]) -> int:
     for i, visited_platform in enumerate(previously_visited_platforms):
         if visited_platform == platform:
             return i
     return 0
 
 
-def second_part_solution(platform: list[list[str]]) -> int:
+def second_part_solution(platform: Grid) -> int:
     N = 1000000000
-    platforms_found: list[list[list[str]]] = [platform]
+    platforms_found: list[Grid] = [platform]
     results: dict[int, list[int]] = {}
     cycle_len = 0
 
@@ -117,15 +89,27 @@ def second_part_solution(platform: list[list[str]]) -> int:
     raise RuntimeError("A solution should have already been found.")
 
 
+def parse(source: InputSource) -> Grid:
+    return Grid.load(source)
+
+
+def part1(platform: Grid) -> int:
+    # tilt_north moves the rocks in place, work on a copy
+    return first_part_solution(platform.copy())
+
+
+def part2(platform: Grid) -> int:
+    return second_part_solution(platform)
+
+
 if __name__ == "__main__":
     t0 = time.perf_counter()
-    with open(os.path.join(os.path.dirname(__file__), "in.txt")) as f:
-        platform = [[ch for ch in line.strip()] for line in f]
+    platform = parse(os.path.join(os.path.dirname(__file__), "in.txt"))
 
-        first_part_res = first_part_solution(platform)
-        print(f"First part solution = {first_part_res}.")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds.")
+    first_part_res = first_part_solution(platform)
+    print(f"First part solution = {first_part_res}.")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds.")
 
-        second_part_res = second_part_solution(platform)
-        print(f"Second part solution = {second_part_res}.")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds.")
+    second_part_res = second_part_solution(platform)
+    print(f"Second part solution = {second_part_res}.")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds.")
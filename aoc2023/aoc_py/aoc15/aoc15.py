@@ -3,6 +3,8 @@ import time
 from dataclasses import dataclass, field
 from typing import Optional
 
+from aoc_py.utils import InputSource, read_input
+
 
 def hash_algo(s: str) -> int:
     curr = 0
@@ -67,14 +69,26 @@ def second_part_solution(data: str) -> int:
     return sum(box.get_value() for box in boxes)
 
 
+def parse(source: InputSource) -> str:
+    return read_input(source).strip()
+
+
+def part1(data: str) -> int:
+    return sum(hash_algo(s) for s in data.split(","))
+
+
+def part2(data: str) -> int:
+    return second_part_solution(data)
+
+
 if __name__ == "__main__":
     t0 = time.perf_counter()
-    with open(os.path.join(os.path.dirname(__file__), "in.txt"), "r", encoding="utf-8") as f:
-        data: str = f.read()
-        first_part_res = sum(hash_algo(s) for s in data.split(","))
-        print(f"First part solution = {first_part_res}.")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds.")
-
-        second_part_res = second_part_solution(data)
-        print(f"First part solution = {second_part_res}.")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds.")
+    data = parse(os.path.join(os.path.dirname(__file__), "in.txt"))
+
+    first_part_res = part1(data)
+    print(f"First part solution = {first_part_res}.")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds.")
+
+    second_part_res = second_part_solution(data)
+    print(f"First part solution = {second_part_res}.")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds.")
@@ -1,43 +1,149 @@
+import math
 import os
 import re
 import time
-from collections import defaultdict
+from array import array
+from dataclasses import dataclass, field
+from typing import Mapping, Optional, Self, Sequence
+
+import numpy as np
+
+from aoc_py.utils import InputSource, read_input
 
 bag = {"red": 12, "green": 13, "blue": 14}
 
+COLORS = ("red", "green", "blue")
+GAME_PATTERN = re.compile(r"Game (?P<game_id>[1-9][0-9]*):(?P<cubes>.*)")
+CUBES_PATTERN = re.compile(r"(?P<n>[1-9][0-9]*) (?P<color>[a-z]+)")
+
+
+@dataclass(slots=True)
+class GameTable:
+    """Columnar table of the games: the id and the max number of cubes revealed for each color."""
+
+    game_ids: array = field(default_factory=lambda: array("I"))
+    max_counts: dict[str, array] = field(default_factory=lambda: {color: array("I") for color in COLORS})
+
+    def __len__(self) -> int:
+        return len(self.game_ids)
+
+
+def parse(source: InputSource) -> GameTable:
+    """Parse all the games with a single pass over the input.
+
+    A color is revealed at most once in each set of cubes, so the max over the sets
+    is the max over all the revealed cubes of the game.
+    """
+    table = GameTable()
+    for line in read_input(source).splitlines():
+        game_match = GAME_PATTERN.match(line)
+        if game_match is None:
+            raise ValueError(f"Cannot find game id in {line}.")
+        table.game_ids.append(int(game_match.group("game_id")))
+
+        max_count = dict.fromkeys(COLORS, 0)
+        for n, color in CUBES_PATTERN.findall(game_match.group("cubes")):
+            if color not in max_count:
+                raise ValueError(f"Unknown color {color} in {line}.")
+            max_count[color] = max(max_count[color], int(n))
+
+        for color in COLORS:
+            table.max_counts[color].append(max_count[color])
+
+    return table
+
+
+def solve(table: GameTable) -> tuple[int, int]:
+    """Solve both parts with a single pass over the table."""
+    max_red, max_green, max_blue = bag.get("red", 0), bag.get("green", 0), bag.get("blue", 0)
+    valid_sum, power_sum = 0, 0
+    for game_id, red, green, blue in zip(table.game_ids, *(table.max_counts[color] for color in COLORS)):
+        if red <= max_red and green <= max_green and blue <= max_blue:
+            valid_sum += game_id
+        # Colors never revealed are left out of the power
+        power_sum += (red or 1) * (green or 1) * (blue or 1)
+    return valid_sum, power_sum
+
+
+# Max number of cells of the cumulative table, above it bags are compared with every game
+MAX_TABLE_CELLS = 1 << 24
+
+
+@dataclass(frozen=True, slots=True)
+class BagQueryEngine:
+    """Answer many bag configurations against the same games.
+
+    Counts of cubes are small, so the ids are accumulated once in a table indexed by the max count of each color,
+    and turned into a cumulative sum over all the colors: the sum for a bag is then a single lookup.
+
+    Examples:
+        >>> engine = BagQueryEngine.from_table(parse(b"Game 1: 3 blue, 4 red; 2 green\\nGame 2: 20 red, 1 blue"))
+        >>> engine.valid_id_sums([bag, {"red": 20, "green": 2, "blue": 3}])
+        array([1, 3])
+    """
+
+    game_ids: np.ndarray  # shape (games,), int64
+    max_counts: np.ndarray  # shape (games, colors), int32, colors ordered as COLORS
+    id_sums: Optional[np.ndarray] = None  # id_sums[r, g, b] = sum of the ids of the games possible with (r, g, b)
+
+    @classmethod
+    def from_table(cls, table: GameTable) -> Self:
+        game_ids = np.array(table.game_ids, dtype=np.int64)
+        max_counts = np.column_stack([np.array(table.max_counts[color], dtype=np.int32) for color in COLORS])
+        max_counts = max_counts.reshape(len(table), len(COLORS))
+
+        shape = tuple(int(x) + 1 for x in max_counts.max(axis=0, initial=0))
+        if math.prod(shape) > MAX_TABLE_CELLS:
+            return cls(game_ids=game_ids, max_counts=max_counts)
+
+        id_sums = np.zeros(shape, dtype=np.int64)
+        np.add.at(id_sums, tuple(max_counts.T), game_ids)
+        for axis in range(id_sums.ndim):
+            np.cumsum(id_sums, axis=axis, out=id_sums)
+        return cls(game_ids=game_ids, max_counts=max_counts, id_sums=id_sums)
+
+    @staticmethod
+    def bags_to_matrix(bags: Sequence[Mapping[str, int]]) -> np.ndarray:
+        """Colors missing from a bag are not available at all."""
+        return np.array([[bag.get(color, 0) for color in COLORS] for bag in bags], dtype=np.int64).reshape(
+            len(bags), len(COLORS)
+        )
+
+    def valid_id_sums(self, bags: np.ndarray | Sequence[Mapping[str, int]], batch_size: int = 256) -> np.ndarray:
+        """Sum of the ids of the games that are possible with each bag.
+
+        Args:
+            bags (np.ndarray | Sequence[Mapping[str, int]]): bags as dicts of cubes per color,
+                or as a matrix of shape (bags, colors) with colors ordered as COLORS.
+            batch_size (int): number of bags compared with all the games at once when there is no cumulative table,
+                it bounds the memory used.
+
+        Returns:
+            np.ndarray: one sum per bag.
+        """
+        bags_matrix = bags if isinstance(bags, np.ndarray) else self.bags_to_matrix(bags)
+
+        if self.id_sums is not None:
+            # Bags holding more cubes than any game are equivalent to the largest entry of the table
+            indices = np.minimum(bags_matrix, np.array(self.id_sums.shape) - 1)
+            sums = self.id_sums[tuple(np.maximum(indices, 0).T)]
+            return np.where((bags_matrix < 0).any(axis=1), 0, sums)
+
+        sums = np.empty(len(bags_matrix), dtype=np.int64)
+        for start in range(0, len(bags_matrix), batch_size):
+            batch = bags_matrix[start : start + batch_size]
+            # shape (batch, games): a game is possible when no color exceeds the bag
+            valid = (self.max_counts[np.newaxis, :, :] <= batch[:, np.newaxis, :]).all(axis=2)
+            sums[start : start + batch_size] = valid @ self.game_ids
+        return sums
+
+
+def part1(table: GameTable) -> int:
+    return solve(table)[0]
+
+
 if __name__ == "__main__":
     t0 = time.perf_counter()
-    with open(os.path.join(os.path.dirname(__file__), "in.txt"), mode="r", encoding="utf-8") as f:
-        sum = 0
-        for line in f:
-            strip_line = line.strip()
-            game, cubes_list = strip_line.split(":")
-
-            game_id_s = re.match(r"^Game (?P<game_id>[1-9][0-9]*)$", game)
-            if game_id_s is None:
-                raise ValueError(f"Cannot find game id in {game_id_s}.")
-
-            game_id = int(game_id_s.groupdict()["game_id"])
-
-            valid_game = True
-            for cubes in cubes_list.strip().split(";"):
-                elements = [x.strip() for x in cubes.strip().split(",")]
-                revealed: dict[str, int] = defaultdict(int)
-                for elem in elements:
-                    elem_match = re.match(r"(?P<n>[1-9][0-9]*) (?P<color>[a-z]+)", elem)
-                    if elem_match is None:
-                        raise ValueError(f"Cannot find n and color in {elem}.")
-
-                    elem_match_dict = elem_match.groupdict()
-                    revealed[elem_match_dict["color"]] = revealed[elem_match_dict["color"]] + int(elem_match_dict["n"])
-
-                    for color, n in revealed.items():
-                        if color not in bag or n > bag[color]:
-                            valid_game = False
-                            break
-
-            if valid_game:
-                sum += game_id
-
-        print(f"{sum=}")
-        print(f"Took: {time.perf_counter() - t0:.5f} seconds")
+    table = parse(os.path.join(os.path.dirname(__file__), "in.txt"))
+    print(f"sum={part1(table)}")
+    print(f"Took: {time.perf_counter() - t0:.5f} seconds")
@@ -1,10 +1,17 @@
-import itertools
+import bisect
 import os
+import re
 import string
 import time
-from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import Optional, Sequence
+from typing import Iterable, Iterator, Sequence
+
+import numpy as np
+
+from aoc_py.grid import Grid
+from aoc_py.utils import InputSource, iter_lines
+
+NUMBER_PATTERN = re.compile(r"[0-9]+")
 
 
 @dataclass(slots=True)
@@ -26,61 +33,6 @@ class GridNumber:
         return int(self.digits)
 
 
-@dataclass(frozen=True)
-class Grid:
-    mat: list[list[str]]
-
-    def __str__(self) -> str:
-        out = ""
-        for row in self.mat:
-            for col in row:
-                out += col
-            out += "\n"
-        return out[:-1]
-
-    def is_cell_digit(self, cell: str) -> int:
-        return cell in string.digits
-
-    def is_cell_dot(self, cell: str) -> int:
-        return cell == "."
-
-    def is_cell_symbol(self, cell: str) -> int:
-        return not self.is_cell_dot(cell) and not self.is_cell_digit(cell)
-
-    def near_symbol(self, i: int, j: int) -> Optional[tuple[int, int]]:
-        indices_to_check = list(itertools.product([0, 1, -1], [0, 1, -1]))
-        for delta_i, delta_j in indices_to_check:
-            if 0 <= i + delta_i < len(self.mat) and 0 <= j + delta_j < len(self.mat[0]):
-                if self.is_cell_symbol(self.mat[i + delta_i][j + delta_j]):
-                    return (i + delta_i, j + delta_j)
-        return None
-
-    def find_engine_numbers(self) -> list[GridNumber]:
-        scanning_number: Optional[GridNumber] = None
-        grid_numbers: list[GridNumber] = []
-        for i in range(len(self.mat)):
-            for j in range(len(self.mat[0])):
-                if self.is_cell_digit(self.mat[i][j]):
-                    if scanning_number is None:
-                        # Start a new scan
-                        scanning_number = GridNumber(digits="")
-                        grid_numbers.append(scanning_number)
-                    # Add digit and check for neighbor symbols
-                    scanning_number.add_digit(self.mat[i][j])
-                    if near := self.near_symbol(i, j):
-                        scanning_number.add_near_symbol(near[0], near[1])
-
-                elif self.is_cell_dot(self.mat[i][j]) or self.is_cell_symbol(self.mat[i][j]):
-                    if scanning_number is not None:
-                        # Stop active scan
-                        scanning_number = None
-
-                if j == len(self.mat[0]) - 1 and scanning_number is not None:
-                    scanning_number = None
-
-        return grid_numbers
-
-
 def compute_first_part_solution(grid_numbers: Sequence[GridNumber]) -> int:
     sum = 0
     for grid_number in grid_numbers:
@@ -89,35 +41,190 @@ def compute_first_part_solution(grid_numbers: Sequence[GridNumber]) -> int:
     return sum
 
 
-def compute_second_part_solution(grid: Grid, grid_numbers: Sequence[GridNumber]) -> int:
-    potential_gears = defaultdict(list)
-    for grid_number in grid_numbers:
-        if grid_number.is_engine_number():
-            for i, j in grid_number.near_symbols:
-                if grid.mat[i][j] == "*":
-                    potential_gears[(i, j)].append(grid_number.num)
+@dataclass(frozen=True, slots=True)
+class GearCandidate:
+    row: int
+    col: int
+    numbers: list[int]
 
-    gears = {k: v[0] * v[1] for (k, v) in potential_gears.items() if len(v) == 2}
-    return sum(gears.values())
+    def is_gear(self) -> bool:
+        return len(self.numbers) == 2
+
+    @property
+    def ratio(self) -> int:
+        return self.numbers[0] * self.numbers[1] if self.is_gear() else 0
+
+
+def stream_schematic(lines: Iterable[str]) -> Iterator[tuple[list[GridNumber], list[GearCandidate]]]:
+    """Scan the schematic with a sliding window of three rows.
+
+    Numbers and gears of a row only depend on the row above and the row below, so a row is complete as soon as
+    the next one is read: memory is O(width) whatever the number of rows.
+
+    Yields:
+        tuple[list[GridNumber], list[GearCandidate]]: numbers and * cells of each row, in order.
+    """
+    # Rows of the window with their numbers as (start, end, value), the end being excluded, and their starts
+    window: list[tuple[str, list[tuple[int, int, int]], list[int]]] = [("", [], [])]
+    row_idx = -1
+
+    def complete_center() -> tuple[list[GridNumber], list[GearCandidate]]:
+        above, (row, numbers, _), below = window
+        grid_numbers = []
+        for start, end, _ in numbers:
+            grid_number = GridNumber(digits=row[start:end])
+            for d_row, near_row in ((-1, above[0]), (0, row), (1, below[0])):
+                for j in range(max(start - 1, 0), min(end + 1, len(near_row))):
+                    if near_row[j] != "." and near_row[j] not in string.digits:
+                        grid_number.add_near_symbol(row_idx + d_row, j)
+            grid_numbers.append(grid_number)
+
+        gears = []
+        j = row.find("*")
+        while j != -1:
+            near_numbers: list[int] = []
+            for _, near, near_starts in window:
+                # Numbers of a row don't overlap, at most two of them start before j + 1 and reach j - 1
+                idx = bisect.bisect_right(near_starts, j + 1)
+                near_numbers.extend(v for start, end, v in near[max(idx - 2, 0) : idx] if end >= j)
+            gears.append(GearCandidate(row=row_idx, col=j, numbers=near_numbers))
+            j = row.find("*", j + 1)
+        return grid_numbers, gears
+
+    for line in lines:
+        # Line terminators would be read as symbols
+        line = line.rstrip("\r\n")
+        numbers = [(m.start(), m.end(), int(m.group())) for m in NUMBER_PATTERN.finditer(line)]
+        window.append((line, numbers, [start for start, _, _ in numbers]))
+        if len(window) == 3:
+            yield complete_center()
+            window.pop(0)
+        row_idx += 1
+
+    if len(window) == 2:
+        window.append(("", [], []))
+        yield complete_center()
+
+
+def stream_solve(source: InputSource) -> tuple[int, int]:
+    """Solve both parts reading the input one line at a time, see stream_schematic."""
+    first_part_sum, second_part_sum = 0, 0
+    for grid_numbers, gears in stream_schematic(iter_lines(source)):
+        first_part_sum += compute_first_part_solution(grid_numbers)
+        second_part_sum += sum(gear.ratio for gear in gears)
+    return first_part_sum, second_part_sum
+
+
+def load_schematic(source: InputSource) -> np.ndarray:
+    """Load the schematic as a uint8 array of shape (rows, cols), one byte per cell."""
+    return Grid.load(source).array
+
+
+@dataclass(frozen=True, slots=True)
+class NumberRuns:
+    """Numbers of a schematic, one entry per run of digits. Columns are [start, end)."""
+
+    rows: np.ndarray
+    starts: np.ndarray
+    ends: np.ndarray
+    values: np.ndarray
+    near_symbol: np.ndarray
+    labels: np.ndarray  # Same shape as the schematic, 1 + index of the run of each digit cell, 0 elsewhere
+
+
+def find_number_runs(schematic: np.ndarray) -> NumberRuns:
+    """Extract all the numbers of the schematic with vectorised operations only."""
+    n_rows, n_cols = schematic.shape
+    is_digit = schematic - np.uint8(ord("0")) < 10
+    is_symbol = ~is_digit & (schematic != ord("."))
+
+    # Dilate the symbols once: a cell is near a symbol if any of its 8 neighbors (or itself) is a symbol
+    padded_symbol = np.pad(is_symbol, 1)
+    near_symbol = np.zeros_like(is_symbol)
+    for d_row in range(3):
+        for d_col in range(3):
+            near_symbol |= padded_symbol[d_row : d_row + n_rows, d_col : d_col + n_cols]
+
+    # A trailing non digit column stops runs from wrapping to the next row
+    digits = np.pad(is_digit, ((0, 0), (0, 1))).ravel()
+    previous = np.concatenate((np.zeros(1, dtype=bool), digits[:-1]))
+    following = np.concatenate((digits[1:], np.zeros(1, dtype=bool)))
+    run_starts = np.flatnonzero(digits & ~previous)
+    run_ends = np.flatnonzero(digits & ~following) + 1
+
+    digit_cells = np.flatnonzero(digits)
+    run_idx = np.cumsum(digits[digit_cells] & ~previous[digit_cells]) - 1
+    offsets = np.searchsorted(digit_cells, run_starts)
+
+    # Each digit weighs 10 ** (number of digits on its right in the run)
+    row_idx, col_idx = np.divmod(digit_cells, n_cols + 1)
+    digit_values = schematic[row_idx, col_idx].astype(np.int64) - ord("0")
+    exponents = run_ends[run_idx] - 1 - digit_cells
+    if len(exponents) and exponents.max() >= 19:
+        raise ValueError("Numbers with more than 18 digits overflow int64.")
+    values = np.add.reduceat(digit_values * 10**exponents, offsets) if len(offsets) else np.zeros(0, dtype=np.int64)
+    run_near_symbol = (
+        np.logical_or.reduceat(near_symbol[row_idx, col_idx], offsets) if len(offsets) else np.zeros(0, dtype=bool)
+    )
+
+    labels = np.zeros(schematic.shape, dtype=np.min_scalar_type(len(run_starts)))
+    labels[row_idx, col_idx] = run_idx + 1
+
+    run_rows = run_starts // (n_cols + 1)
+    return NumberRuns(
+        rows=run_rows,
+        starts=run_starts - run_rows * (n_cols + 1),
+        ends=run_ends - run_rows * (n_cols + 1),
+        values=values,
+        near_symbol=run_near_symbol,
+        labels=labels,
+    )
+
+
+def gear_ratios(schematic: np.ndarray, runs: NumberRuns) -> np.ndarray:
+    """Ratios of the * cells adjacent to exactly two numbers."""
+    n_rows, n_cols = schematic.shape
+    star_rows, star_cols = np.nonzero(schematic == ord("*"))
+    padded_labels = np.pad(runs.labels, 1)
+    neighbors = np.stack(
+        [padded_labels[star_rows + d_row, star_cols + d_col] for d_row in range(3) for d_col in range(3)], axis=1
+    )
+
+    # Neighbor cells of the same number share its label, count the distinct ones
+    neighbors.sort(axis=1)
+    distinct = neighbors != 0
+    distinct[:, 1:] &= neighbors[:, 1:] != neighbors[:, :-1]
+    is_gear = distinct.sum(axis=1) == 2
+    pairs = neighbors[is_gear][distinct[is_gear]].reshape(-1, 2) - 1
+    return runs.values[pairs[:, 0]] * runs.values[pairs[:, 1]]
+
+
+def bulk_solve(schematic: np.ndarray) -> tuple[int, int]:
+    runs = find_number_runs(schematic)
+    return int(runs.values[runs.near_symbol].sum()), int(gear_ratios(schematic, runs).sum())
 
 
-if __name__ == "__main__":
-    t0 = time.perf_counter()
-    with open(os.path.join(os.path.dirname(__file__), "in.txt"), mode="r", encoding="utf-8") as f:
-        grid_mat = []
+def parse(source: InputSource) -> Grid:
+    return Grid.load(source)
+
+
+def part1(grid: Grid) -> int:
+    runs = find_number_runs(grid.array)
+    return int(runs.values[runs.near_symbol].sum())
 
-        for line in f:
-            grid_mat.append([ch for ch in line.strip()])
 
-        grid = Grid(mat=grid_mat)
-        grid_numbers = grid.find_engine_numbers()
+def part2(grid: Grid) -> int:
+    schematic = grid.array
+    return int(gear_ratios(schematic, find_number_runs(schematic)).sum())
 
-        first_solution = compute_first_part_solution(grid_numbers)
-        print("First part")
-        print(f"sum={first_solution}")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds.")
 
-        second_solution = compute_second_part_solution(grid, grid_numbers)
-        print("Second part")
-        print(f"sum={second_solution}")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds.")
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    grid = parse(os.path.join(os.path.dirname(__file__), "in.txt"))
+    first_solution, second_solution = bulk_solve(grid.array)
+
+    print("First part")
+    print(f"sum={first_solution}")
+    print("Second part")
+    print(f"sum={second_solution}")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds.")
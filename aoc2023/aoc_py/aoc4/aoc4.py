@@ -1,33 +1,120 @@
 import os
 import time
-from collections import defaultdict
+from dataclasses import dataclass
 
-if __name__ == "__main__":
-    t0 = time.perf_counter()
-    with open(os.path.join(os.path.dirname(__file__), "in.txt"), mode="r", encoding="utf-8") as f:
-        card_to_num: dict[int, int] = defaultdict(int)
-        first_part_sum = 0
+import numpy as np
+
+from aoc_py.utils import InputSource
+
+# Number of cards compared at once, bounds the (cards, numbers, winning numbers) comparison
+BATCH_SIZE = 1 << 14
+
+
+@dataclass(frozen=True, slots=True)
+class CardTable:
+    """All the scratchcards as fixed width integer arrays, one row per card."""
+
+    card_nums: np.ndarray
+    winning_nums: np.ndarray
+    nums: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.card_nums)
+
+
+def parse(source: InputSource) -> CardTable:
+    """Parse all the cards at once, every card must have as many numbers as the first one."""
+    if isinstance(source, bytes):
+        data = source
+    else:
+        with open(source, mode="rb") as f:
+            data = f.read()
+    if not data.strip():
+        empty = np.zeros((0, 0), dtype=np.int64)
+        return CardTable(card_nums=np.zeros(0, dtype=np.int64), winning_nums=empty, nums=empty)
+
+    first_line = data.split(b"\n", 1)[0]
+    head, _, tail = first_line.partition(b"|")
+    n_winning, n_nums = len(head.partition(b":")[2].split()), len(tail.split())
+
+    # Once the card labels are dropped the input is a flat sequence of integers, split in cards by the | and newlines
+    text = data.translate(None, delete=b"Card:")
+    if text.translate(None, delete=b"0123456789 |\r\n"):
+        raise ValueError("Cards can only contain numbers.")
+    chars = np.frombuffer(text, dtype=np.uint8)
+    is_digit = chars - np.uint8(ord("0")) < 10
+    is_first_digit = is_digit & ~np.concatenate((np.zeros(1, dtype=bool), is_digit[:-1]))
+    n_seen = np.cumsum(is_first_digit)
 
-        for line in f:
-            card_and_nums_s, winning_nums_s = line.split(" | ")
-            card_s, nums_s = card_and_nums_s.split(": ")
+    # Count the integers of each line, blank lines have none
+    width = 1 + n_winning + n_nums
+    counts = np.diff(n_seen[chars == ord("\n")], prepend=0, append=n_seen[-1])
+    if (counts[counts > 0] != width).any():
+        raise ValueError("All the cards must have the same count of numbers.")
+    # The k-th | must come right after the winning numbers of the k-th card
+    n_cards = int(np.count_nonzero(counts))
+    bars = np.flatnonzero(chars == ord("|"))
+    if len(bars) != n_cards or (n_seen[bars] != np.arange(n_cards) * width + 1 + n_winning).any():
+        raise ValueError("All the cards must have the same count of winning numbers.")
 
-            card_num = int(card_s.split()[1])
-            nums = set(int(x) for x in nums_s.strip().split())
-            winning_nums = set(int(x) for x in winning_nums_s.strip().split())
+    fields = np.fromstring(text.replace(b"|", b" "), dtype=np.int64, sep=" ")
+    rows = fields.reshape(-1, width)
+    card_nums = rows[:, 0]
+    # Copies are won by position, which is the card number only if cards are numbered in order
+    if (card_nums != np.arange(card_nums[0], card_nums[0] + len(card_nums))).any():
+        raise ValueError("Cards must be numbered consecutively.")
+    return CardTable(card_nums=card_nums, winning_nums=rows[:, 1 : 1 + n_winning], nums=rows[:, 1 + n_winning :])
 
-            card_to_num[card_num] += 1
-            n_winning = len(nums & winning_nums)
-            if n_winning:
-                # First part solution
-                first_part_sum += 1 * 2 ** (n_winning - 1)
 
-                # Second part solution
-                for i in range(n_winning):
-                    card_to_num[card_num + i + 1] += card_to_num[card_num]
+def count_matches(table: CardTable, batch_size: int = BATCH_SIZE) -> np.ndarray:
+    """Count the distinct numbers of each card that are also winning numbers."""
+    matches = np.zeros(len(table), dtype=np.int64)
+    for start in range(0, len(table), batch_size):
+        nums = np.sort(table.nums[start : start + batch_size], axis=1)
+        winning_nums = table.winning_nums[start : start + batch_size]
+        is_match = (nums[:, :, None] == winning_nums[:, None, :]).any(axis=2)
+        # A number repeated on a card only matches once
+        is_match[:, 1:] &= nums[:, 1:] != nums[:, :-1]
+        matches[start : start + batch_size] = is_match.sum(axis=1)
+    return matches
+
+
+def count_copies(matches: np.ndarray) -> list[int]:
+    """Number of instances of each card, original included.
+
+    Card i adds its instances to the next matches[i] cards: the additions are kept in a difference array,
+    so each card is visited once whatever its number of matches. Copies past the last card are dropped.
+    """
+    n_cards = len(matches)
+    diff = [0] * (n_cards + 1)
+    copies = []
+    won = 0
+    for i, n_matches in enumerate(matches.tolist()):
+        won += diff[i]
+        instances = 1 + won
+        copies.append(instances)
+        if n_matches:
+            diff[i + 1] += instances
+            diff[min(i + 1 + n_matches, n_cards)] -= instances
+    return copies
+
+
+def part1(table: CardTable) -> int:
+    # Cards with the same number of matches are worth the same points
+    counts = np.bincount(count_matches(table))
+    return sum(int(count) << (n_matches - 1) for n_matches, count in enumerate(counts.tolist()) if n_matches)
+
+
+def part2(table: CardTable) -> int:
+    return sum(count_copies(count_matches(table)))
+
+
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    table = parse(os.path.join(os.path.dirname(__file__), "in.txt"))
 
-        print(f"First part solution={first_part_sum}")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds.")
+    print(f"First part solution={part1(table)}")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds.")
 
-        print(f"Second part solution={sum(card_to_num.values())}")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds.")
+    print(f"Second part solution={part2(table)}")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds.")
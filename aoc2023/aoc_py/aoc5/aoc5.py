@@ -1,7 +1,12 @@
+import bisect
 import os
 import time
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Iterator, Self
+
+import numpy as np
+
+from aoc_py.utils import InputSource, read_input
 
 
 @dataclass(frozen=True, slots=True)
@@ -10,36 +15,44 @@ class Interval:
     dest: int
     range_: int
 
-    def contains(self, x: int) -> bool:
-        return self.source <= x < self.source + self.range_
-
-    def get_target(self, x: int) -> Optional[int]:
-        if self.contains(x):
-            diff = x - self.source
-            return self.dest + diff
-        return None
-
-
-@dataclass(slots=True)
-class Match:
-    num: int
-    targets: list[int] = field(default_factory=list)
-    matched_intervals: list[Interval] = field(default_factory=list)
-
 
 @dataclass(slots=True)
 class Mapping:
     intervals: list[Interval] = field(default_factory=list)
+    # Sources of the sorted intervals, set with the dummy intervals
+    sources: list[int] = field(default_factory=list)
 
-    def get_target(self, x: Match) -> Match:
-        for interval in self.intervals:
-            target = interval.get_target(x.targets[-1] if x.targets else x.num)
-            if target is not None:
-                x.targets.append(target)
-                x.matched_intervals.append(interval)
-                return x
+    def split(self, start: int, end: int) -> Iterator[tuple[int, int, int]]:
+        """Split the [start, end) range at the boundaries of the intervals it overlaps.
 
-        raise RuntimeError("Should never arrive here")
+        Requires the dummy intervals, so that the intervals cover all the non-negative numbers.
+
+        Yields:
+            tuple[int, int, int]: start and end of each piece, with the offset added to its numbers by the mapping.
+        """
+        sources = self.sources
+        if len(sources) != len(self.intervals):
+            raise RuntimeError("The dummy intervals must be added before splitting ranges.")
+        idx = bisect.bisect_right(sources, start) - 1
+        if idx < 0:
+            raise ValueError(f"Cannot map negative number {start}.")
+        # The last dummy interval shares its source with the previous one, which must be checked first
+        idx = bisect.bisect_left(sources, sources[idx])
+
+        pos = start
+        while pos < end:
+            interval = self.intervals[idx]
+            stop = min(end, interval.source + interval.range_)
+            if stop > pos:
+                yield pos, stop, interval.dest - interval.source
+                pos = stop
+            idx += 1
+
+    def map_ranges(self, ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        """Map [start, end) ranges of numbers, split at the boundaries of the intervals they overlap."""
+        return merge_ranges(
+            [(pos + offset, stop + offset) for start, end in ranges for pos, stop, offset in self.split(start, end)]
+        )
 
     def add_dummy_intervals(self) -> None:
         """
@@ -74,71 +87,133 @@ class Mapping:
 
         last_interval = self.intervals[-1]
         self.intervals.append(Interval(last_interval.source, last_interval.source, int(1e20)))
+        self.sources = [interval.source for interval in self.intervals]
+
+
+def merge_ranges(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Sort [start, end) ranges and merge the ones that overlap or touch."""
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+@dataclass(slots=True)
+class Almanac:
+    seeds: list[int]
+    cascade_maps: list[Mapping]
+
+
+# Highest seed of the composed index, mapped numbers stay far from the int64 limit
+MAX_SEED = (1 << 62) - 1
+
 
+@dataclass(frozen=True, slots=True)
+class AlmanacIndex:
+    """All the maps of the cascade composed into a single piecewise-linear map from seeds to locations.
+
+    Seeds in [breakpoints[k], breakpoints[k + 1]) are mapped to seed + offsets[k]: a batch of seeds is mapped
+    with a single searchsorted. The index only depends on the maps, it can be saved once and loaded for each batch.
+
+    Examples:
+        >>> index = AlmanacIndex.from_maps(parse(b"seeds: 79\\n\\nseed-to-soil map:\\n52 50 48\\n50 98 2").cascade_maps)
+        >>> index.breakpoints.tolist(), index.offsets.tolist(), index.lookup(np.array([10, 79, 98])).tolist()
+        ([0, 50, 98, 100], [0, 2, -48, 0], [10, 81, 50])
+    """
 
-def first_solution(cascade_maps: list[Mapping]) -> int:
-    lowest_location: Optional[int] = None
-    for seed in seeds:
-        curr = Match(num=seed)
+    breakpoints: np.ndarray
+    offsets: np.ndarray
+
+    @classmethod
+    def from_maps(cls, cascade_maps: list[Mapping]) -> Self:
+        # Pieces of the composed map as (start, end, offset)
+        pieces = [(0, MAX_SEED + 1, 0)]
         for mapping in cascade_maps:
-            curr = mapping.get_target(curr)
-        lowest_location = curr.targets[-1] if lowest_location is None else min(lowest_location, curr.targets[-1])
+            pieces = [
+                (pos - offset, stop - offset, offset + map_offset)
+                for start, end, offset in pieces
+                for pos, stop, map_offset in mapping.split(start + offset, end + offset)
+            ]
+
+        breakpoints: list[int] = []
+        offsets: list[int] = []
+        for start, _, offset in pieces:
+            # Neighbour pieces with the same offset are a single piece
+            if not offsets or offset != offsets[-1]:
+                breakpoints.append(start)
+                offsets.append(offset)
+        return cls(breakpoints=np.array(breakpoints, dtype=np.int64), offsets=np.array(offsets, dtype=np.int64))
+
+    def lookup(self, seeds: np.ndarray) -> np.ndarray:
+        if len(seeds) and (seeds.min() < 0 or seeds.max() > MAX_SEED):
+            raise ValueError(f"Seeds must be between 0 and {MAX_SEED}.")
+        return seeds + self.offsets[np.searchsorted(self.breakpoints, seeds, side="right") - 1]
+
+    def save(self, path: str | os.PathLike[str]) -> None:
+        np.savez(path, breakpoints=self.breakpoints, offsets=self.offsets)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str]) -> Self:
+        with np.load(path) as data:
+            return cls(breakpoints=data["breakpoints"], offsets=data["offsets"])
+
 
-    assert lowest_location is not None
-    return lowest_location
+def first_solution(cascade_maps: list[Mapping], seeds: list[int]) -> int:
+    if not seeds:
+        raise ValueError("There are no seeds to plant.")
+    return int(AlmanacIndex.from_maps(cascade_maps).lookup(np.array(seeds, dtype=np.int64)).min())
 
 
 def second_solution(cascade_maps: list[Mapping], seeds: list[int], ranges: list[int]) -> int:
-    lowest: Optional[int] = None
+    """Map whole ranges of seeds through the maps, the lowest location is the start of the first final range.
 
-    for seed, seed_range in zip(seeds, ranges):
-        num = seed
-        can_skip = 0
-        while True:
-            curr = Match(num=num)
+    The number of ranges depends on the number of intervals they cross, never on the number of seeds.
+    """
+    curr = merge_ranges([(seed, seed + seed_range) for seed, seed_range in zip(seeds, ranges) if seed_range > 0])
+    for mapping in cascade_maps:
+        curr = mapping.map_ranges(curr)
 
-            for map in cascade_maps:
-                curr = map.get_target(curr)
+    if not curr:
+        raise ValueError("There are no seeds to plant.")
+    return curr[0][0]
 
-            lowest = curr.targets[-1] if lowest is None else min(curr.targets[-1], lowest)
 
-            # We may skip to check at most this number of seeds starting from our current seed
-            # Because we are sure that all the target locations (solutions) between seed and seed + can_skip are higher
-            # We can't skip more because we may end in intervals which lead to better lowest target locations
-            can_skip = min(
-                [
-                    (curr.matched_intervals[i].dest + curr.matched_intervals[i].range_) - curr.targets[i] - 1
-                    for i in range(len(curr.matched_intervals))
-                ]
-            )
-            num += max(can_skip, 1)
-            if num >= seed + seed_range:
-                break
+def parse(source: InputSource) -> Almanac:
+    blocks = read_input(source).strip().split("\n\n")
 
-    assert lowest is not None
-    return lowest
+    seeds = [int(x) for x in blocks[0].split(": ")[1].split()]
+    cascade_maps = []
 
+    for mapping in blocks[1:]:
+        new_map = Mapping()
+        name, data_s = mapping.split(":\n")
+        for line_data in data_s.split("\n"):
+            dest, source_, range_ = [int(x) for x in line_data.split()]
+            new_map.intervals.append(Interval(source_, dest, range_))
+
+        cascade_maps.append(new_map)
+        new_map.add_dummy_intervals()
+
+    return Almanac(seeds=seeds, cascade_maps=cascade_maps)
 
-if __name__ == "__main__":
-    t0 = time.perf_counter()
-    with open(os.path.join(os.path.dirname(__file__), "in.txt"), mode="r", encoding="utf-8") as f:
-        blocks = f.read().split("\n\n")
 
-        seeds = [int(x) for x in blocks[0].split(": ")[1].split()]
-        cascade_maps = []
+def part1(almanac: Almanac) -> int:
+    return first_solution(almanac.cascade_maps, almanac.seeds)
 
-        for mapping in blocks[1:]:
-            new_map = Mapping()
-            name, data_s = mapping.split(":\n")
-            for line_data in data_s.split("\n"):
-                dest, source, range_ = [int(x) for x in line_data.split()]
-                new_map.intervals.append(Interval(source, dest, range_))
 
-            cascade_maps.append(new_map)
-            new_map.add_dummy_intervals()
+def part2(almanac: Almanac) -> int:
+    return second_solution(almanac.cascade_maps, almanac.seeds[0::2], almanac.seeds[1::2])
+
+
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    almanac = parse(os.path.join(os.path.dirname(__file__), "in.txt"))
 
-        print("First part solution", first_solution(cascade_maps))
-        print(f"Took {time.perf_counter() - t0:.5f} seconds")
+    print("First part solution", part1(almanac))
+    print(f"Took {time.perf_counter() - t0:.5f} seconds")
 
-        print("Second part solution", second_solution(cascade_maps, seeds[0::2], seeds[1::2]))
-        print(f"Took {time.perf_counter() - t0:.5f} seconds")
+    print("Second part solution", part2(almanac))
+    print(f"Took {time.perf_counter() - t0:.5f} seconds")
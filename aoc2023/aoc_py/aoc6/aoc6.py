@@ -3,6 +3,11 @@ import operator
 import os
 import time
 from functools import reduce
+from typing import Sequence
+
+import numpy as np
+
+from aoc_py.utils import InputSource, read_input
 
 
 def compute_n_holding_ways(time: int, distance: int) -> int:
@@ -10,17 +15,69 @@ def compute_n_holding_ways(time: int, distance: int) -> int:
     Find winning holding milliseconds
     by solving (time - x) * x > distance
     where x is the holding time
+
+    Integers are exact whatever their size: the lower root is estimated with an integer square root,
+    then moved to the first winning holding time. Winning times are symmetric around time / 2.
+    """
+    if time < 0 or time * time - 4 * distance <= 0:
+        return 0
+
+    lower = max((time - math.isqrt(time * time - 4 * distance)) // 2, 0)
+    while lower * (time - lower) <= distance:
+        if lower > time // 2:
+            # The best holding time doesn't win either
+            return 0
+        lower += 1
+    while lower > 0 and (lower - 1) * (time - lower + 1) > distance:
+        lower -= 1
+    return time - 2 * lower + 1
+
+
+# Below it, products of holding times fit in int64 and the float square root is close to the exact one
+FAST_TIME_LIMIT = 1 << 31
+FAST_DISTANCE_LIMIT = 1 << 60
+
+
+def count_holding_ways_batch(times: Sequence[int] | np.ndarray, distances: Sequence[int] | np.ndarray) -> np.ndarray:
+    """Count the winning holding times of many races at once.
+
+    Races with a small enough time are solved with vectorised int64 and float64 operations,
+    the others with compute_n_holding_ways.
+
+    Returns:
+        np.ndarray: number of winning holding times of each race, with an object dtype if some don't fit int64.
     """
-    b = -time
-    c = distance
-    a = 1
+    times_arr, distances_arr = np.asarray(times), np.asarray(distances)
+    if times_arr.shape != distances_arr.shape or times_arr.ndim != 1:
+        raise ValueError("Times and distances must be flat sequences of the same length.")
+
+    fast = (
+        (times_arr >= 0)
+        & (times_arr < FAST_TIME_LIMIT)
+        & (distances_arr > -FAST_DISTANCE_LIMIT)
+        & (distances_arr < FAST_DISTANCE_LIMIT)
+    ).astype(bool)
+    time = times_arr[fast].astype(np.int64)
+    distance = distances_arr[fast].astype(np.int64)
 
-    lower = (-b - math.sqrt(b**2 - 4 * a * c)) / (2 * a)
-    upper = (-b + math.sqrt(b**2 - 4 * a * c)) / (2 * a)
+    # The float estimate is at most one away from the exact lower root: start below it and move up
+    disc = np.maximum(time * time - 4 * distance, 0)
+    lower = np.floor((time - np.sqrt(disc.astype(np.float64))) / 2).astype(np.int64) - 1
+    lower = np.clip(lower, 0, time // 2)
+    for _ in range(3):
+        lower += (lower < time // 2) & (lower * (time - lower) <= distance)
+    wins = (time // 2) * (time - time // 2) > distance
+    counts = np.where(wins, time - 2 * lower + 1, 0)
 
-    lower_int = int(lower + 1) if int(lower) == lower else math.ceil(lower)
-    upper_int = int(upper - 1) if int(upper) == upper else math.floor(upper)
-    return upper_int - lower_int + 1
+    slow_counts = [
+        compute_n_holding_ways(int(t), int(d)) for t, d in zip(times_arr[~fast].tolist(), distances_arr[~fast].tolist())
+    ]
+    if any(count >= 1 << 63 for count in slow_counts):
+        counts = counts.astype(object)
+    result = np.empty(len(times_arr), dtype=counts.dtype)
+    result[fast] = counts
+    result[~fast] = slow_counts
+    return result
 
 
 def first_part_solution(times: list[int], distances: list[int]) -> int:
@@ -34,14 +91,27 @@ def second_part_solution(times: list[int], distances: list[int]) -> int:
     return compute_n_holding_ways(time, distance)
 
 
+def parse(source: InputSource) -> tuple[list[int], list[int]]:
+    times_s, distances_s = read_input(source).splitlines()[:2]
+    times = [int(x) for x in times_s.split(": ")[1].strip().split()]
+    distances = [int(x) for x in distances_s.split(": ")[1].strip().split()]
+    return times, distances
+
+
+def part1(races: tuple[list[int], list[int]]) -> int:
+    return first_part_solution(*races)
+
+
+def part2(races: tuple[list[int], list[int]]) -> int:
+    return second_part_solution(*races)
+
+
 if __name__ == "__main__":
     t0 = time.perf_counter()
-    with open(os.path.join(os.path.dirname(__file__), "in.txt"), mode="r", encoding="utf-8") as f:
-        times = [int(x) for x in f.readline().split(": ")[1].strip().split()]
-        distances = [int(x) for x in f.readline().split(": ")[1].strip().split()]
+    times, distances = parse(os.path.join(os.path.dirname(__file__), "in.txt"))
 
-        print(f"First part solution={first_part_solution(times, distances)}")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds")
+    print(f"First part solution={first_part_solution(times, distances)}")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds")
 
-        print(f"Second part solution={second_part_solution(times, distances)}")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds")
+    print(f"Second part solution={second_part_solution(times, distances)}")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds")
@@ -1,10 +1,15 @@
+import functools
 import os
+import tempfile
 import time
-from collections import Counter
 from dataclasses import dataclass
 from enum import Enum
-from functools import cached_property
-from typing import Self
+from types import MappingProxyType
+from typing import Mapping, Sequence
+
+import numpy as np
+
+from aoc_py.utils import InputSource, read_input
 
 NUMERIC_VALS = {
     "A": 14,
@@ -16,26 +21,6 @@ NUMERIC_VALS = {
 }
 
 
-@dataclass(frozen=True, slots=True)
-class Card:
-    symbol: str
-
-    @property
-    def value(self) -> int:
-        return NUMERIC_VALS[self.symbol]
-
-    def __lt__(self, other: Self) -> bool:
-        return self.value < other.value
-
-    def __eq__(self, other: object) -> bool:
-        if not isinstance(other, Card):
-            return False
-        return self.value == other.value
-
-    def is_joker(self) -> bool:
-        return self.symbol == "J"
-
-
 class HandKind(Enum):
     FIVE_OF_A_KIND = 0
     FOUR_OF_A_KIND = 1
@@ -45,140 +30,273 @@ class HandKind(Enum):
     ONE_PAIR = 5
     HIGH_CARD = 6
 
-
-@dataclass(frozen=True)
-class Hand:
-    cards: list[Card]
-    bid: int
-
-    def __str__(self) -> str:
-        return f"Hand({''.join(c.symbol for c in self.cards)})"
-
-    def has_jokers(self) -> bool:
-        return any(card.is_joker() for card in self.cards)
-
-    @property
-    def kind_using_jokers(self) -> HandKind:
-        best_kind = self.kind
-        if best_kind == HandKind.FIVE_OF_A_KIND:
-            return best_kind
-
-        jokers_indices = [i for i in range(len(self.cards)) if self.cards[i] == Card("J")]
-        most_common_card, most_common_count = [x for x in self.counts_most_common if x[0] != Card("J")][0]
-
-        new_cards = list(self.cards)
-        for joker_idx in jokers_indices:
-            new_cards[joker_idx] = most_common_card
-        new_hand = Hand(cards=new_cards, bid=self.bid)
-
-        new_hand_counts_most_common = new_hand.counts_most_common
-        most_common_card, most_common_count = new_hand_counts_most_common[0]
-        if most_common_count == 5:
-            best_kind = HandKind.FIVE_OF_A_KIND
-
-        elif most_common_count == 4:
-            best_kind = HandKind.FOUR_OF_A_KIND
-
-        elif most_common_count == 3:
-            second_most_common_card, second_most_common_count = new_hand_counts_most_common[1]
-            if second_most_common_count == 2:
-                best_kind = HandKind.FULL_HOUSE
-            else:
-                best_kind = HandKind.THREE_OF_A_KIND
-
-        elif most_common_count == 2:
-            second_most_common_card, second_most_common_count = new_hand_counts_most_common[1]
-            if second_most_common_count == 2:
-                best_kind = HandKind.TWO_PAIR
-            else:
-                best_kind = HandKind.ONE_PAIR
-
-        return best_kind
-
-    def get_best_kind(self, use_jokers: bool) -> HandKind:
-        if use_jokers and self.has_jokers():
-            return self.kind_using_jokers
-        return self.kind
-
-    @property
-    def kind(self) -> HandKind:
-        counts_most_common = self.counts_most_common
-        most_common = counts_most_common[0][1]
+    @classmethod
+    def from_counts(cls, most_common: int, second_most_common: int) -> "HandKind":
         if most_common == 5:
-            return HandKind.FIVE_OF_A_KIND
+            return cls.FIVE_OF_A_KIND
         elif most_common == 4:
-            return HandKind.FOUR_OF_A_KIND
+            return cls.FOUR_OF_A_KIND
         elif most_common == 3:
-            if counts_most_common[1][1] == 2:
-                return HandKind.FULL_HOUSE
-            return HandKind.THREE_OF_A_KIND
+            return cls.FULL_HOUSE if second_most_common == 2 else cls.THREE_OF_A_KIND
         elif most_common == 2:
-            if counts_most_common[1][1] == 2:
-                return HandKind.TWO_PAIR
-            return HandKind.ONE_PAIR
-        return HandKind.HIGH_CARD
+            return cls.TWO_PAIR if second_most_common == 2 else cls.ONE_PAIR
+        return cls.HIGH_CARD
 
-    def __lt__(self, other: Self) -> bool:
-        for card, other_card in zip(self.cards, other.cards):
-            if card == other_card:
-                continue
-            return True if card < other_card else False
-        raise RuntimeError()
 
-    def __eq__(self, other: object) -> bool:
-        if not isinstance(object, Hand):
-            return False
-        return self.counts == other.counts
+@dataclass(frozen=True, slots=True)
+class Rules:
+    """Value of each card and whether J cards are jokers, which count as the most common other card."""
 
-    @cached_property
-    def counts_most_common(self) -> list[tuple[Card, int]]:
-        return self.counts.most_common()
+    card_values: Mapping[str, int]
+    jokers: bool
 
-    @cached_property
-    def counts(self) -> Counter:
-        return Counter(self.cards)
 
+RULES = {
+    "normal": Rules(card_values=MappingProxyType(dict(NUMERIC_VALS)), jokers=False),
+    "jokers": Rules(card_values=MappingProxyType({**NUMERIC_VALS, "J": 1}), jokers=True),
+}
 
-def first_part_solution(hands: list[Hand], use_jokers: bool = False) -> int:
-    groups: dict[HandKind, list[Hand]] = {}
-    for hand in hands:
-        hand_kind = hand.get_best_kind(use_jokers=use_jokers)
-        groups.setdefault(hand_kind, []).append(hand)
+# Bits of each card in a packed key, card values are below 16
+CARD_BITS = 4
+N_CARDS = 5
+
+
+def hand_kind(symbols: str, rules: Rules) -> HandKind:
+    n_jokers = symbols.count("J") if rules.jokers else 0
+    others = symbols.replace("J", "") if rules.jokers else symbols
+    counts = sorted((others.count(symbol) for symbol in set(others)), reverse=True) + [0, 0]
+    return HandKind.from_counts(counts[0] + n_jokers, counts[1])
+
+
+def hand_key(symbols: str, rules: Rules) -> int:
+    """Pack the strength of a hand in an integer: the kind first, then the value of each card in order.
+
+    Stronger hands have greater keys, so that hands are ranked by sorting their keys.
+
+    Examples:
+        >>> hex(hand_key("KTJJT", RULES["normal"])), hex(hand_key("KTJJT", RULES["jokers"]))
+        ('0x2dabba', '0x5da11a')
+    """
+    if len(symbols) != N_CARDS:
+        raise ValueError(f"A hand must have {N_CARDS} cards, got {symbols}.")
+    key = len(HandKind) - 1 - hand_kind(symbols, rules).value
+    for symbol in symbols:
+        key = key << CARD_BITS | rules.card_values[symbol]
+    return key
+
+
+# Order of the cards in the index of a hand, from 0 to 12
+CARD_SYMBOLS = "23456789TJQKA"
+CARD_INDICES = np.full(256, len(CARD_SYMBOLS), dtype=np.uint8)
+CARD_INDICES[np.frombuffer(CARD_SYMBOLS.encode("utf-8"), dtype=np.uint8)] = np.arange(len(CARD_SYMBOLS))
+N_HANDS = len(CARD_SYMBOLS) ** N_CARDS
+
+KIND_TABLE_PATH = os.path.join(os.path.dirname(__file__), "kinds.npy")
+
+
+def build_kind_table() -> np.ndarray:
+    """Kind of every possible hand, indexed by [rules.jokers, hand index]: 13 ** 5 hands under both rules."""
+    # Cards of every hand, the first card is the most significant digit of the index
+    cards = np.stack(np.unravel_index(np.arange(N_HANDS), (len(CARD_SYMBOLS),) * N_CARDS), axis=1)
+    counts = np.zeros((N_HANDS, len(CARD_SYMBOLS)), dtype=np.uint8)
+    for i in range(N_CARDS):
+        counts[np.arange(N_HANDS), cards[:, i]] += 1
+
+    table = np.empty((2, N_HANDS), dtype=np.uint8)
+    for jokers in (False, True):
+        n_jokers = np.zeros(N_HANDS, dtype=np.uint8)
+        if jokers:
+            joker = CARD_SYMBOLS.index("J")
+            n_jokers = counts[:, joker].copy()
+            counts[:, joker] = 0
+        top_counts = -np.sort(-counts.astype(np.int8), axis=1)[:, :2]
+        most_common, second_most_common = top_counts[:, 0] + n_jokers, top_counts[:, 1]
+        table[int(jokers)] = np.select(
+            [
+                most_common == 5,
+                most_common == 4,
+                (most_common == 3) & (second_most_common == 2),
+                most_common == 3,
+                (most_common == 2) & (second_most_common == 2),
+                most_common == 2,
+            ],
+            [kind.value for kind in list(HandKind)[:-1]],
+            default=HandKind.HIGH_CARD.value,
+        )
+    return table
+
+
+@functools.cache
+def load_kind_table(path: str = KIND_TABLE_PATH) -> np.ndarray:
+    """Memory-map the kind table, it is built and saved the first time or when the saved one is invalid."""
+    try:
+        table = np.load(path, mmap_mode="r")
+        if table.shape == (2, N_HANDS) and table.dtype == np.uint8:
+            return table
+    except (OSError, ValueError, EOFError):
+        pass
+
+    table = build_kind_table()
+    # Saved to a temporary file renamed in place, so that concurrent or interrupted saves never leave a partial table
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path), suffix=".tmp")
+    except OSError:
+        # Cannot write next to the module, keep the table in memory
+        return table
+    try:
+        with os.fdopen(fd, mode="wb") as f:
+            np.save(f, table)
+        os.replace(tmp_path, path)
+    except OSError:
+        os.unlink(tmp_path)
+    return table
+
+
+def hand_indices(hands: Sequence[str]) -> np.ndarray:
+    """Index of each hand in the kind table, the cards are the digits of the index in base 13."""
+    cards = CARD_INDICES[np.frombuffer("".join(hands).encode("utf-8"), dtype=np.uint8)]
+    if len(cards) != N_CARDS * len(hands) or (cards == len(CARD_SYMBOLS)).any():
+        raise ValueError(f"Hands must have {N_CARDS} cards among {CARD_SYMBOLS}.")
+    return cards.reshape(-1, N_CARDS).astype(np.int64) @ len(CARD_SYMBOLS) ** np.arange(N_CARDS - 1, -1, -1)
+
+
+def hand_keys(indices: np.ndarray, rules: Rules) -> np.ndarray:
+    """Vectorised hand_key of hands given by their index, kinds are read from the kind table."""
+    strengths = len(HandKind) - 1 - load_kind_table()[int(rules.jokers)][indices].astype(np.int64)
+    card_values = np.array([rules.card_values[symbol] for symbol in CARD_SYMBOLS], dtype=np.int64)
+    keys = strengths
+    for i in range(N_CARDS - 1, -1, -1):
+        keys = keys << CARD_BITS | card_values[indices // len(CARD_SYMBOLS) ** i % len(CARD_SYMBOLS)]
+    return keys
+
+
+def total_winnings(keys: np.ndarray, bids: np.ndarray) -> int:
+    """Sum of the bids weighted by the rank of their hand, from 1 for the weakest one."""
+    order = np.argsort(keys, kind="stable")
+    return int(bids[order] @ np.arange(1, len(keys) + 1, dtype=np.int64))
 
-    for group in groups.keys():
-        groups[group].sort()
 
-    res = 0
-    rank = 1
-    for kind in reversed(HandKind):
-        if kind not in groups:
-            continue
+@dataclass(frozen=True, slots=True)
+class Hands:
+    """Symbols of each hand and their bids, in the order of the input."""
+
+    symbols: list[str]
+    bids: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+
+class FenwickTree:
+    """Prefix sums of a list of integers, updated in O(log n)."""
+
+    def __init__(self, size: int) -> None:
+        self.tree = [0] * (size + 1)
+
+    def add(self, idx: int, delta: int) -> None:
+        idx += 1
+        while idx < len(self.tree):
+            self.tree[idx] += delta
+            idx += idx & -idx
+
+    def prefix_sum(self, idx: int) -> int:
+        """Sum of the values before idx."""
+        total = 0
+        while idx > 0:
+            total += self.tree[idx]
+            idx -= idx & -idx
+        return total
+
+
+class WinningsTracker:
+    """Total winnings of a changing set of hands, updated in O(log n) when a hand is inserted or removed.
+
+    Every possible hand has a fixed position in the strength order, so counts and bids are kept in Fenwick trees
+    over the 13 ** 5 positions: the rank of a hand is 1 + the number of hands before it. Hands must be unique.
+
+    Examples:
+        >>> tracker = WinningsTracker(RULES["jokers"])
+        >>> tracker.insert("KK677", 28), tracker.insert("T55J5", 220), tracker.insert("KTJJT", 220)
+        (28, 468, 1128)
+        >>> tracker.remove("T55J5")
+        468
+    """
+
+    def __init__(self, rules: Rules) -> None:
+        keys = hand_keys(np.arange(N_HANDS), rules)
+        self.positions = np.empty(N_HANDS, dtype=np.int64)
+        self.positions[np.argsort(keys)] = np.arange(N_HANDS)
+        self.counts = FenwickTree(N_HANDS)
+        self.bid_sums = FenwickTree(N_HANDS)
+        self.bids: dict[str, int] = {}
+        self.total = 0
+
+    def __len__(self) -> int:
+        return len(self.bids)
+
+    def __contains__(self, hand: str) -> bool:
+        return hand in self.bids
+
+    def _position(self, hand: str) -> int:
+        return int(self.positions[hand_indices([hand])[0]])
+
+    def _change(self, position: int, bid: int, sign: int) -> None:
+        # The hand and all the hands above it, which move up or down by one rank
+        rank = 1 + self.counts.prefix_sum(position)
+        bids_above = self.bid_sums.prefix_sum(N_HANDS) - self.bid_sums.prefix_sum(position + 1)
+        self.total += sign * (bid * rank + bids_above)
+        self.counts.add(position, sign)
+        self.bid_sums.add(position, sign * bid)
+
+    def insert(self, hand: str, bid: int) -> int:
+        """Add a hand and return the new total winnings."""
+        if hand in self.bids:
+            raise ValueError(f"Hand {hand} is already ranked.")
+        position = self._position(hand)
+        self.bids[hand] = bid
+        self._change(position, bid, sign=1)
+        return self.total
+
+    def remove(self, hand: str) -> int:
+        """Remove a hand and return the new total winnings."""
+        if hand not in self.bids:
+            raise KeyError(hand)
+        self._change(self._position(hand), self.bids.pop(hand), sign=-1)
+        return self.total
+
+
+def first_part_solution(hands: Hands, use_jokers: bool = False) -> int:
+    rules = RULES["jokers" if use_jokers else "normal"]
+    return total_winnings(hand_keys(hand_indices(hands.symbols), rules), hands.bids)
+
+
+def second_part_solution(hands: Hands) -> int:
+    return first_part_solution(hands, use_jokers=True)
 
-        for hand in groups[kind]:
-            res += hand.bid * rank
-            rank += 1
 
-    return res
+def parse(source: InputSource) -> Hands:
+    fields = read_input(source).split()
+    if len(fields) % 2:
+        raise ValueError("Every hand must have a bid.")
+    return Hands(symbols=fields[::2], bids=np.array([int(bid) for bid in fields[1::2]], dtype=np.int64))
 
 
-def second_part_solution(hands: list[Hand]) -> int:
-    NUMERIC_VALS["J"] = 1
-    return first_part_solution(hands, use_jokers=True)
+def part1(hands: Hands) -> int:
+    return first_part_solution(hands)
+
+
+def part2(hands: Hands) -> int:
+    return second_part_solution(hands)
 
 
 if __name__ == "__main__":
     t0 = time.perf_counter()
-    with open(os.path.join(os.path.dirname(__file__), "in.txt"), mode="r", encoding="utf-8") as f:
-        t0 = time.perf_counter()
-        hands = []
-        for line in f:
-            hand, bid = line.split()
-            hands.append(Hand(cards=[Card(symbol) for symbol in hand], bid=int(bid)))
-
-        first_part_res = first_part_solution(hands)
-        print(f"First part solution: {first_part_res}")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds.")
-
-        second_part_res = second_part_solution(hands)
-        print(f"Second part solution: {second_part_res}")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds.")
+    hands = parse(os.path.join(os.path.dirname(__file__), "in.txt"))
+
+    first_part_res = first_part_solution(hands)
+    print(f"First part solution: {first_part_res}")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds.")
+
+    second_part_res = second_part_solution(hands)
+    print(f"Second part solution: {second_part_res}")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds.")
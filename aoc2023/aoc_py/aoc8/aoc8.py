@@ -1,83 +1,355 @@
 import math
 import os
 import time
-from dataclasses import dataclass, field
-from typing import Callable, Optional, Self
+from array import array
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from aoc_py.utils import InputSource, read_input
+
+
+def ends_with(names: np.ndarray, suffix: str) -> np.ndarray:
+    """Vectorised names.endswith(suffix) over an array of str, on the code points of the names."""
+    codes = names.view(np.uint32).reshape(len(names), names.itemsize // 4)
+    lengths = np.count_nonzero(codes, axis=1)
+    is_match = lengths >= len(suffix)
+    for k, char in enumerate(reversed(suffix), start=1):
+        is_match &= codes[np.arange(len(names)), np.maximum(lengths - k, 0)] == ord(char)
+    return is_match
 
 
 @dataclass(slots=True)
-class NetworkNode:
-    name: str
-    left: Optional[Self] = field(repr=False, default=None)
-    right: Optional[Self] = field(repr=False, default=None)
-    cache: dict = field(default_factory=dict)
+class Network:
+    instructions: str
+    names: np.ndarray
+    # Position of each name in names
+    indices: dict[str, int]
+    # Indices of the left and right node of each node, in the order of names
+    left: np.ndarray
+    right: np.ndarray
+
+
+@dataclass(frozen=True, slots=True)
+class PassJumps:
+    """Jump tables over whole passes of the instructions, for the nodes where passes start.
+
+    nodes holds the sorted indices of these nodes. For the k-th of them, jumps[0, k] is the position in nodes of
+    the node reached after one pass and first_hit[k] the first step of the pass reaching a target (0 if none).
+    Level l of jumps and hits covers 2 ** l passes, so the first target is found with a logarithmic number of jumps
+    instead of a walk of every step.
+    """
+
+    nodes: np.ndarray
+    first_hit: np.ndarray
+    jumps: np.ndarray
+    hits: np.ndarray
+    n_instructions: int
+
+    def steps_to_target(self, start: int) -> int:
+        """Number of steps from the start node to the first target, the start itself is not checked."""
+        curr = int(np.searchsorted(self.nodes, start))
+        if curr == len(self.nodes) or self.nodes[curr] != start:
+            raise ValueError(f"Passes from node {start} have not been compiled.")
+
+        n_passes = 0
+        for level in range(len(self.jumps) - 1, -1, -1):
+            if not self.hits[level, curr]:
+                curr = int(self.jumps[level, curr])
+                n_passes += 1 << level
+
+        if not self.first_hit[curr]:
+            raise ValueError(f"No target can be reached from node {start}.")
+        return n_passes * self.n_instructions + int(self.first_hit[curr])
+
+
+@dataclass(frozen=True, slots=True)
+class GhostCycle:
+    """Steps at which a ghost walking from a start node is on a target.
+
+    States (node, instruction index) repeat from step cycle_start with a period of cycle_len steps: the ghost is on
+    a target at the steps of tail_hits, then at the steps of cycle_hits plus any multiple of cycle_len.
+    """
+
+    tail_hits: list[int]
+    cycle_start: int
+    cycle_len: int
+    cycle_hits: list[int]
+
+    def is_hit(self, step: int) -> bool:
+        if step < self.cycle_start:
+            return step in self.tail_hits
+        return self.cycle_start + (step - self.cycle_start) % self.cycle_len in self.cycle_hits
+
+
+def crt(r1: int, m1: int, r2: int, m2: int) -> Optional[tuple[int, int]]:
+    """Generalised chinese remainder theorem: solve x = r1 (mod m1), x = r2 (mod m2) for non coprime moduli.
+
+    Returns:
+        Optional[tuple[int, int]]: x and the lcm of the moduli, None if the congruences are incompatible.
+    """
+    g = math.gcd(m1, m2)
+    if (r2 - r1) % g:
+        return None
+    k = (r2 - r1) // g * pow(m1 // g, -1, m2 // g) % (m2 // g)
+    modulus = m1 // g * m2
+    return (r1 + m1 * k) % modulus, modulus
+
+
+def earliest_common_hit(cycles: list[GhostCycle]) -> int:
+    """First step, from 1 on, at which all the ghosts are on a target at the same time."""
+    if not cycles:
+        raise ValueError("There are no ghosts.")
+    # Before all the ghosts are in their cycle, the step must be in the tail of the last one to get there
+    last_to_cycle = max(cycles, key=lambda cycle: cycle.cycle_start)
+    for step in last_to_cycle.tail_hits:
+        if all(cycle.is_hit(step) for cycle in cycles):
+            return step
+
+    # Afterwards, the hits of each cycle are congruences modulo its length: combine them one ghost at a time
+    residues, modulus = [0], 1
+    for cycle in cycles:
+        combined = set()
+        for residue in residues:
+            for hit in cycle.cycle_hits:
+                if solution := crt(residue, modulus, hit, cycle.cycle_len):
+                    combined.add(solution[0])
+        residues, modulus = sorted(combined), math.lcm(modulus, cycle.cycle_len)
+    if not residues:
+        raise ValueError("The ghosts are never all on a target at the same time.")
+
+    lowest = max(1, last_to_cycle.cycle_start)
+    # Smallest step congruent to a residue and not before all the ghosts are in their cycle
+    return min(residue + (lowest - residue + modulus - 1) // modulus * modulus for residue in residues)
+
+
+# Below this number of nodes walking them one by one is faster than with array operations
+MAX_SCALAR_WALKS = 8
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledNetwork:
+    """Network as int32 arrays of node indices, with a mask of the target nodes."""
 
-    def __str__(self) -> str:
-        assert self.left is not None and self.right is not None
-        return f"NetworkNode(name={self.name},left={self.left.name},right={self.right.name})"
+    network: Network
+    is_target: np.ndarray
 
+    @property
+    def left(self) -> np.ndarray:
+        return self.network.left
 
-def solve(start_node: NetworkNode, instructions: str, fn_is_target: Callable[[NetworkNode], bool]) -> int:
-    ins_idx = 0
-    steps = 0
-    curr = start_node
+    @property
+    def right(self) -> np.ndarray:
+        return self.network.right
 
-    while True:
-        steps += 1
-        instruction = instructions[ins_idx]
+    @property
+    def instructions(self) -> str:
+        return self.network.instructions
 
-        assert curr.left is not None and curr.right is not None
-        curr = curr.left if instruction == "L" else curr.right
+    def indices(self, names: list[str]) -> list[int]:
+        unknown = [name for name in names if name not in self.network.indices]
+        if unknown:
+            raise ValueError(f"Unknown nodes {sorted(unknown)}.")
+        return [self.network.indices[name] for name in names]
 
-        ins_idx = (ins_idx + 1) % len(instructions)
+    def walk_pass(self, nodes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Walk one pass of the instructions from all the nodes at once.
 
-        if fn_is_target(curr):
-            break
+        Returns:
+            tuple[np.ndarray, np.ndarray]: node reached at the end of the pass and first step reaching a target.
+        """
+        if len(nodes) <= MAX_SCALAR_WALKS:
+            return self._walk_pass_scalar(nodes)
 
-    return steps
+        curr = nodes
+        first_hit = np.zeros(len(nodes), dtype=np.int64)
+        for step, instruction in enumerate(self.instructions, start=1):
+            curr = self.left[curr] if instruction == "L" else self.right[curr]
+            first_hit[(first_hit == 0) & self.is_target[curr]] = step
+        return curr, first_hit
+
+    def _walk_pass_scalar(self, nodes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # Indexing memoryviews gives Python ints without going through numpy scalars
+        left, right, is_target = self.left.data, self.right.data, self.is_target.data
+        ends, first_hits = [], []
+        for node in nodes.tolist():
+            first_hit = 0
+            for step, instruction in enumerate(self.instructions, start=1):
+                node = left[node] if instruction == "L" else right[node]
+                if not first_hit and is_target[node]:
+                    first_hit = step
+            ends.append(node)
+            first_hits.append(first_hit)
+        return np.array(ends, dtype=np.int32), np.array(first_hits, dtype=np.int64)
+
+    def walk_pass_hits(self, nodes: np.ndarray) -> tuple[np.ndarray, list[list[int]]]:
+        """Walk one pass of the instructions from all the nodes at once, keeping every step reaching a target."""
+        if len(nodes) <= MAX_SCALAR_WALKS:
+            return self._walk_pass_hits_scalar(nodes)
+
+        curr = nodes
+        hits: list[list[int]] = [[] for _ in range(len(nodes))]
+        for step, instruction in enumerate(self.instructions, start=1):
+            curr = self.left[curr] if instruction == "L" else self.right[curr]
+            for i in np.flatnonzero(self.is_target[curr]).tolist():
+                hits[i].append(step)
+        return curr, hits
+
+    def _walk_pass_hits_scalar(self, nodes: np.ndarray) -> tuple[np.ndarray, list[list[int]]]:
+        left, right, is_target = self.left.data, self.right.data, self.is_target.data
+        ends, hits = [], []
+        for node in nodes.tolist():
+            node_hits = []
+            for step, instruction in enumerate(self.instructions, start=1):
+                node = left[node] if instruction == "L" else right[node]
+                if is_target[node]:
+                    node_hits.append(step)
+            ends.append(node)
+            hits.append(node_hits)
+        return np.array(ends, dtype=np.int32), hits
+
+    def ghost_cycles(self, starts: list[str]) -> list[GhostCycle]:
+        """Walk from each start node until its states repeat, all the ghosts one pass at a time.
+
+        States at the start of a pass only depend on the node, so a ghost is in its cycle as soon as it starts
+        a pass from a node already seen at the start of one: at most len(names) passes for each ghost.
+        """
+        n_instructions = len(self.instructions)
+        curr = self.indices(starts)
+        pass_starts: list[dict[int, int]] = [{} for _ in starts]
+        hits: list[list[int]] = [[] for _ in starts]
+        cycles: list[Optional[GhostCycle]] = [None] * len(starts)
+
+        active = list(range(len(starts)))
+        while active:
+            for ghost in active:
+                pass_starts[ghost][curr[ghost]] = len(pass_starts[ghost])
+            ends, pass_hits = self.walk_pass_hits(np.array([curr[ghost] for ghost in active], dtype=np.int32))
+
+            still_active = []
+            for ghost, end, ghost_hits in zip(active, ends.tolist(), pass_hits):
+                n_passes = len(pass_starts[ghost])
+                hits[ghost].extend((n_passes - 1) * n_instructions + step for step in ghost_hits)
+                curr[ghost] = end
+                if end not in pass_starts[ghost]:
+                    still_active.append(ghost)
+                    continue
+
+                # The end of the last pass is the start of an earlier one, the same state as step cycle_start
+                cycle_start = pass_starts[ghost][end] * n_instructions
+                cycle_len = n_passes * n_instructions - cycle_start
+                cycles[ghost] = GhostCycle(
+                    tail_hits=[hit for hit in hits[ghost] if hit < cycle_start],
+                    cycle_start=cycle_start,
+                    cycle_len=cycle_len,
+                    cycle_hits=sorted(
+                        {
+                            hit if hit < cycle_start + cycle_len else hit - cycle_len
+                            for hit in hits[ghost]
+                            if hit >= cycle_start
+                        }
+                    ),
+                )
+            active = still_active
+
+        return [cycle for cycle in cycles if cycle is not None]
+
+    def pass_jumps(self, starts: list[str]) -> PassJumps:
+        """Build the jump tables for the nodes where passes start when walking from the start nodes."""
+        # Discover the nodes starting a pass breadth first, walking all the new ones at once
+        nodes: list[np.ndarray] = []
+        pass_ends: list[np.ndarray] = []
+        first_hits: list[np.ndarray] = []
+        seen = np.zeros(len(self.left), dtype=bool)
+        frontier = np.unique(np.array(self.indices(starts), dtype=np.int32))
+        while len(frontier):
+            seen[frontier] = True
+            pass_end, first_hit = self.walk_pass(frontier)
+            nodes.append(frontier)
+            pass_ends.append(pass_end)
+            first_hits.append(first_hit)
+            frontier = np.unique(pass_end[~seen[pass_end]])
+
+        all_nodes = np.concatenate(nodes) if nodes else np.zeros(0, dtype=np.int32)
+        order = np.argsort(all_nodes)
+        all_nodes = all_nodes[order]
+        pass_end = np.concatenate(pass_ends)[order] if nodes else all_nodes
+        first_hit = np.concatenate(first_hits)[order] if nodes else np.zeros(0, dtype=np.int64)
+
+        # Passes are eventually periodic with a period of at most len(all_nodes) passes:
+        # a target not reached after 2 * len(all_nodes) passes is never reached
+        n_levels = max(1, (2 * len(all_nodes)).bit_length())
+        jumps = np.empty((n_levels, len(all_nodes)), dtype=np.int32)
+        hits = np.empty((n_levels, len(all_nodes)), dtype=bool)
+        jumps[0], hits[0] = np.searchsorted(all_nodes, pass_end), first_hit > 0
+        for level in range(1, n_levels):
+            jumps[level] = jumps[level - 1][jumps[level - 1]]
+            hits[level] = hits[level - 1] | hits[level - 1][jumps[level - 1]]
+
+        return PassJumps(
+            nodes=all_nodes, first_hit=first_hit, jumps=jumps, hits=hits, n_instructions=len(self.instructions)
+        )
+
+    def walk_to_target(self, start: int) -> int:
+        """Number of steps from the start node to the first target, walking one pass at a time."""
+        n_instructions = len(self.instructions)
+        seen = set()
+        curr, n_passes = start, 0
+        while curr not in seen:
+            seen.add(curr)
+            ends, first_hits = self._walk_pass_scalar(np.array([curr], dtype=np.int32))
+            if first_hits[0]:
+                return n_passes * n_instructions + int(first_hits[0])
+            curr, n_passes = int(ends[0]), n_passes + 1
+        raise ValueError(f"No target can be reached from node {start}.")
+
+    def steps_to_target(self, starts: list[str]) -> list[int]:
+        # A few walks stop at their first target, before the jump tables would have walked every reachable pass
+        if len(starts) <= MAX_SCALAR_WALKS:
+            return [self.walk_to_target(start) for start in self.indices(starts)]
+        jumps = self.pass_jumps(starts)
+        return [jumps.steps_to_target(start) for start in self.indices(starts)]
+
+
+def parse(source: InputSource) -> Network:
+    instructions, network = read_input(source).strip().split("\n\n")
+
+    lines = [line.split(" = ") for line in network.split("\n")]
+    names = [node for node, _ in lines]
+    indices = {name: idx for idx, name in enumerate(names)}
+    left_indices, right_indices = array("i"), array("i")
+    for _, members in lines:
+        left, right = members[1:-1].split(", ")
+        left_indices.append(indices[left])
+        right_indices.append(indices[right])
+
+    return Network(
+        instructions=instructions.strip(),
+        names=np.array(names),
+        indices=indices,
+        left=np.frombuffer(left_indices, dtype=np.int32),
+        right=np.frombuffer(right_indices, dtype=np.int32),
+    )
+
+
+def part1(network: Network) -> int:
+    return CompiledNetwork(network, is_target=network.names == "ZZZ").steps_to_target(["AAA"])[0]
+
+
+def part2(network: Network) -> int:
+    # Each ghost is on a target at some steps of its tail, then periodically once its states cycle:
+    # combine the periods with the chinese remainder theorem instead of assuming the first hit is the period
+    compiled = CompiledNetwork(network, is_target=ends_with(network.names, "Z"))
+    return earliest_common_hit(compiled.ghost_cycles(network.names[ends_with(network.names, "A")].tolist()))
 
 
 if __name__ == "__main__":
     t0 = time.perf_counter()
-    with open(os.path.join(os.path.dirname(__file__), "in.txt"), mode="r", encoding="utf-8") as f:
-        instructions, network = f.read().split("\n\n")
-
-        nodes_id_to_members = {}
-        for line in network.split("\n"):
-            node, members = line.split(" = ")
-            network_node = NetworkNode(name=node)
-            left_right_split = members.split(", ")
-            nodes_id_to_members[node] = (network_node, (left_right_split[0][1:], left_right_split[1][:-1]))
-
-        network_nodes = []
-        start_node = None
-        start_nodes = []
-        for name, (network_node, (left, right)) in nodes_id_to_members.items():
-            network_node.left = nodes_id_to_members[left][0]
-            network_node.right = nodes_id_to_members[right][0]
-            network_nodes.append(network_node)
-            if name == "AAA":
-                start_node = network_node
-            if name[-1] == "A":
-                start_nodes.append(network_node)
-
-        # First part
-        assert start_node is not None
-        first_part_res = solve(start_node, instructions, fn_is_target=lambda node: node.name == "ZZZ")
-        print(f"First part solution = {first_part_res}")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds.")
-
-        # Second part
-        # Intution:
-        # Assume we have three different starting point (S1, S2, S3) leading to three different destinations (D1, D2, D3).
-        # If following S1 we reach D1 in 2 steps
-        # If following S2 we reach D2 in 3 steps
-        # If following S3 we reach D3 in 7 steps
-        # We can reach all of three at the same time after 2*3*7 steps
-        # Therefore we need to find the least common multiple of the three
-        steps_list = []
-        for start_node in start_nodes:
-            steps_list.append(solve(start_node, instructions, fn_is_target=lambda node: node.name[-1] == "Z"))
-
-        print(f"Second part solution = {math.lcm(*steps_list)}")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds.")
+    network = parse(os.path.join(os.path.dirname(__file__), "in.txt"))
+
+    print(f"First part solution = {part1(network)}")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds.")
+
+    print(f"Second part solution = {part2(network)}")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds.")
@@ -1,41 +1,241 @@
+import functools
 import os
+import time
+from typing import Hashable, Iterable, Sequence
 
+import numpy as np
 
-def find_diff_sequence(sequence: list[int]) -> list[int]:
-    return [sequence[i + 1] - sequence[i] for i in range(len(sequence) - 1)]
+from aoc_py.utils import InputSource, read_input
 
+INT64_MAX = np.iinfo(np.int64).max
+# Levels of the difference table kept by the online extrapolators
+DEFAULT_DEPTH = 32
 
-def solve(sequences: list[list[int]]) -> tuple[int, int]:
-    first_part_res, second_part_res = 0, 0
+
+@functools.cache
+def extrapolation_weights(length: int) -> np.ndarray:
+    """Weights giving the next and the previous values of a sequence as a dot product with its values.
+
+    The n-th differences of a sequence of n values sampled from a polynomial are zero, so the next value is
+    sum((-1) ** (n - i + 1) * comb(n, i) * sequence[i]); the previous value uses the same weights reversed.
+    Returned as an array of shape (length, 2), with an object dtype when the weights do not fit in int64.
+    """
+    weights = [(-1) ** (length - i + 1) * comb for i, comb in enumerate(binomials(length)[:-1])]
+    dtype = np.int64 if length < 63 else object
+    return np.array([weights, weights[::-1]], dtype=dtype).T
+
+
+def binomials(n: int) -> list[int]:
+    row = [1]
+    for k in range(n):
+        row.append(row[-1] * (n - k) // (k + 1))
+    return row
+
+
+def group_by_length(sequences: list[list[int]]) -> dict[int, np.ndarray]:
+    """Stack the sequences of each length in a 2D array, in int64 when all their values fit."""
+    buckets: dict[int, list[list[int]]] = {}
     for sequence in sequences:
-        curr = sequence
-        last_values, reduced = [curr[-1]], [curr]
-        while not all(x == 0 for x in curr):
-            curr = find_diff_sequence(curr)
-            last_values.append(curr[-1])
-            reduced.append(curr)
-        first_part_res += sum(last_values)
+        if not sequence:
+            raise ValueError("Sequences can not be empty.")
+        buckets.setdefault(len(sequence), []).append(sequence)
+
+    grouped = {}
+    for length, bucket in buckets.items():
+        try:
+            grouped[length] = np.array(bucket, dtype=np.int64)
+        except OverflowError:
+            grouped[length] = np.array(bucket, dtype=object)
+    return grouped
+
+
+def extrapolate_batch(rows: np.ndarray) -> np.ndarray:
+    """Next and previous values of sequences of the same length, as an array of shape (len(rows), 2).
+
+    The product is done in int64 only when it can not overflow, the bound being the largest absolute value
+    times the sum of the absolute weights, else it falls back to exact Python integers.
+    """
+    weights = extrapolation_weights(rows.shape[1])
+    if rows.dtype == np.int64 and weights.dtype == np.int64 and len(rows):
+        max_abs = int(np.abs(rows).max())
+        if max_abs * ((1 << rows.shape[1]) - 1) <= INT64_MAX:
+            return rows @ weights
+    return rows.astype(object) @ weights.astype(object)
+
+
+def exact_sum(values: np.ndarray) -> int:
+    if values.dtype == np.int64 and len(values) * int(np.abs(values).max(initial=0)) <= INT64_MAX:
+        return int(values.sum())
+    return sum(values.tolist())
+
+
+class Extrapolator:
+    """Next and previous values of a sequence that grows one value at a time.
+
+    Only the last and the first diagonals of the difference table are kept: appending a value rebuilds the
+    last diagonal in O(depth), the first one only gains its new bottom level. Like in ExtrapolatorStore only the
+    first depth levels are kept, so the predictions are exact for polynomials of degree < depth.
+
+    Examples:
+        >>> extrapolator = Extrapolator([10, 13, 16, 21, 30])
+        >>> extrapolator.next_value, extrapolator.previous_value
+        (45, 5)
+        >>> extrapolator.append(45)
+        >>> extrapolator.next_value
+        68
+    """
+
+    __slots__ = ("depth", "n_values", "last_diagonal", "first_diagonal")
+
+    def __init__(self, values: Iterable[int] = (), depth: int = DEFAULT_DEPTH) -> None:
+        if depth < 1:
+            raise ValueError("The depth must be at least 1.")
+        self.depth = depth
+        self.n_values = 0
+        self.last_diagonal: list[int] = []
+        self.first_diagonal: list[int] = []
+        self.extend(values)
+
+    def __len__(self) -> int:
+        return self.n_values
+
+    def append(self, value: int) -> None:
+        diagonal = [value]
+        for diff in self.last_diagonal[: self.depth - 1]:
+            diagonal.append(diagonal[-1] - diff)
+        self.last_diagonal = diagonal
+        if len(self.first_diagonal) < len(diagonal):
+            self.first_diagonal.append(diagonal[-1])
+        self.n_values += 1
+
+    def extend(self, values: Iterable[int]) -> None:
+        for value in values:
+            self.append(value)
+
+    @property
+    def next_value(self) -> int:
+        if not self.last_diagonal:
+            raise ValueError("Sequences can not be empty.")
+        return sum(self.last_diagonal)
+
+    @property
+    def previous_value(self) -> int:
+        if not self.first_diagonal:
+            raise ValueError("Sequences can not be empty.")
+        return sum(diff if k % 2 == 0 else -diff for k, diff in enumerate(self.first_diagonal))
 
-        backward_preds = [0]
-        for red in reversed(reduced):
-            first_value = red[0]
-            backward_preds.append(first_value - backward_preds[-1])
 
-        second_part_res += backward_preds[-1]
+class ExtrapolatorStore:
+    """Many keyed sequences growing one value at a time, extrapolated together in int64 arrays.
 
+    Stream i is row i of the diagonal arrays, created when its first value is appended. Only the first depth
+    levels of the difference table are kept, so the predictions are exact for polynomials of degree < depth.
+    """
+
+    __slots__ = ("depth", "rows", "counts", "last_diagonals", "first_diagonals", "max_abs")
+
+    def __init__(self, depth: int = DEFAULT_DEPTH) -> None:
+        if not 0 < depth < 62:
+            raise ValueError("The depth must be between 1 and 61.")
+        self.depth = depth
+        self.rows: dict[Hashable, int] = {}
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.last_diagonals = np.zeros((0, depth), dtype=np.int64)
+        self.first_diagonals = np.zeros((0, depth), dtype=np.int64)
+        self.max_abs = 0
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.rows
+
+    def _grow(self, n_rows: int) -> None:
+        capacity = len(self.counts)
+        if n_rows <= capacity:
+            return
+        capacity = max(n_rows, 2 * capacity)
+        for name in ("counts", "last_diagonals", "first_diagonals"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=np.int64)
+            new[: len(old)] = old
+            setattr(self, name, new)
+
+    def _row_indices(self, keys: Sequence[Hashable]) -> np.ndarray:
+        try:
+            return np.array([self.rows[key] for key in keys], dtype=np.int64)
+        except KeyError as e:
+            raise KeyError(f"Unknown stream {e.args[0]!r}.") from None
+
+    def append(self, keys: Sequence[Hashable], values: Sequence[int]) -> None:
+        """Append one value to each of the streams, a stream can only appear once per call."""
+        if len(keys) != len(values):
+            raise ValueError("There must be one value per stream.")
+        if len(set(keys)) != len(keys):
+            raise ValueError("A stream can only be appended one value at a time.")
+        new_values = np.asarray(values, dtype=np.int64)
+        # Level k of the difference table is bounded by 2 ** k times the largest value, and the predictions by
+        # 2 ** depth times the largest value
+        max_abs = max(self.max_abs, int(np.abs(new_values).max(initial=0)))
+        if max_abs << self.depth > INT64_MAX:
+            raise OverflowError("The predictions could overflow int64, use a smaller depth.")
+        self.max_abs = max_abs
+
+        for key in keys:
+            if key not in self.rows:
+                self.rows[key] = len(self.rows)
+        self._grow(len(self.rows))
+        rows = self._row_indices(keys)
+
+        old = self.last_diagonals[rows]
+        new = np.empty_like(old)
+        new[:, 0] = new_values
+        for k in range(1, self.depth):
+            new[:, k] = new[:, k - 1] - old[:, k - 1]
+        counts = self.counts[rows] + 1
+        # Levels below the new count have no value yet
+        new[np.arange(self.depth) >= counts[:, None]] = 0
+        self.last_diagonals[rows] = new
+        self.counts[rows] = counts
+
+        is_new_level = counts <= self.depth
+        levels = counts[is_new_level] - 1
+        self.first_diagonals[rows[is_new_level], levels] = new[is_new_level, levels]
+
+    def next_values(self, keys: Sequence[Hashable]) -> np.ndarray:
+        return self.last_diagonals[self._row_indices(keys)].sum(axis=1)
+
+    def previous_values(self, keys: Sequence[Hashable]) -> np.ndarray:
+        signs = np.where(np.arange(self.depth) % 2 == 0, 1, -1)
+        return self.first_diagonals[self._row_indices(keys)] @ signs
+
+
+def solve(sequences: list[list[int]]) -> tuple[int, int]:
+    first_part_res, second_part_res = 0, 0
+    for rows in group_by_length(sequences).values():
+        predictions = extrapolate_batch(rows)
+        first_part_res += exact_sum(predictions[:, 0])
+        second_part_res += exact_sum(predictions[:, 1])
     return first_part_res, second_part_res
 
 
-if __name__ == "__main__":
-    import time
+def parse(source: InputSource) -> list[list[int]]:
+    return [[int(x) for x in line.split()] for line in read_input(source).splitlines()]
+
 
+def part1(sequences: list[list[int]]) -> int:
+    return solve(sequences)[0]
+
+
+def part2(sequences: list[list[int]]) -> int:
+    return solve(sequences)[1]
+
+
+if __name__ == "__main__":
     t0 = time.perf_counter()
-    with open(os.path.join(os.path.dirname(__file__), "in.txt")) as f:
-        sequences = []
-        for line in f:
-            sequences.append([int(x) for x in line.split()])
-
-        first_part_res, second_part_res = solve(sequences)
-        print(f"First part solution = {first_part_res}")
-        print(f"Second part solution = {second_part_res}")
-        print(f"Took {time.perf_counter() - t0:.5f} seconds.")
+    sequences = parse(os.path.join(os.path.dirname(__file__), "in.txt"))
+
+    first_part_res, second_part_res = solve(sequences)
+    print(f"First part solution = {first_part_res}")
+    print(f"Second part solution = {second_part_res}")
+    print(f"Took {time.perf_counter() - t0:.5f} seconds.")
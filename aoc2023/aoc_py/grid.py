@@ -0,0 +1,175 @@
+import mmap
+import os
+from typing import Iterable, Iterator, Optional, Self
+
+import numpy as np
+
+from aoc_py.utils import InputSource
+
+Buffer = bytearray | mmap.mmap
+
+ORTHOGONAL = ((-1, 0), (0, 1), (1, 0), (0, -1))
+DIAGONAL = ((-1, -1), (-1, 1), (1, 1), (1, -1))
+
+
+class Grid:
+    """2D grid of single byte cells stored in one contiguous buffer.
+
+    Cell (i, j) is the byte at index i * stride + j of the buffer: when the grid is loaded from a file,
+    the buffer is the memory-mapped file itself and the stride skips the line terminators.
+    Cells are read as str with grid[i, j], or as ints with grid.get(i * grid.stride + j) in hot loops.
+    The array property is a zero-copy numpy view of the cells for vectorised code.
+
+    Examples:
+        >>> grid = Grid.from_lines(["#.", ".O"])
+        >>> grid[1, 1], grid.row(0), grid.col(1), grid.array.shape
+        ('O', b'#.', b'.O', (2, 2))
+    """
+
+    __slots__ = ("data", "n_rows", "n_cols", "stride")
+
+    def __init__(self, data: Buffer, n_rows: int, n_cols: int, stride: Optional[int] = None) -> None:
+        self.data = data
+        self.n_rows = n_rows
+        self.n_cols = n_cols
+        self.stride = n_cols if stride is None else stride
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str | bytes]) -> Self:
+        rows = [line.encode("utf-8") if isinstance(line, str) else line for line in lines]
+        n_cols = len(rows[0]) if rows else 0
+        if any(len(row) != n_cols for row in rows):
+            raise ValueError("All the rows of the grid must have the same length.")
+        return cls(bytearray(b"".join(rows)), len(rows), n_cols)
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> Self:
+        n_rows, n_cols = array.shape
+        return cls(bytearray(np.ascontiguousarray(array, dtype=np.uint8).tobytes()), n_rows, n_cols)
+
+    @classmethod
+    def load(cls, source: InputSource) -> Self:
+        """Load a grid made of all the lines of the input.
+
+        Files are memory-mapped copy-on-write: cells are not copied and writes are never flushed to the file.
+        """
+        if isinstance(source, bytes):
+            return cls._from_buffer(bytearray(source))
+
+        with open(source, mode="rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return cls._from_buffer(bytearray())
+            return cls._from_buffer(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY))
+
+    @classmethod
+    def _from_buffer(cls, data: Buffer) -> Self:
+        if not len(data):
+            return cls(data, 0, 0)
+
+        first_newline = data.find(b"\n")
+        if first_newline == -1:
+            return cls(data, 1, len(data))
+
+        n_cols = first_newline - 1 if first_newline and data[first_newline - 1] == ord("\r") else first_newline
+        stride = first_newline + 1
+        # The last line may not be terminated
+        terminated = data[-1] == ord("\n")
+        cells = np.frombuffer(data, dtype=np.uint8)
+        n_terminated = int(np.count_nonzero(cells == ord("\n")))
+        n_rows = n_terminated + (not terminated)
+        if len(data) != n_rows * stride - (0 if terminated else stride - n_cols):
+            raise ValueError("All the rows of the grid must have the same length.")
+        # Ragged rows can still add up to the right length, the terminators must sit at the end of every row
+        for k, byte in enumerate(data[n_cols:stride]):
+            if (cells[n_cols + k :: stride][:n_terminated] != byte).any():
+                raise ValueError("All the rows of the grid must have the same length.")
+        return cls(data, n_rows, n_cols, stride)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.n_rows, self.n_cols
+
+    @property
+    def array(self) -> np.ndarray:
+        """Zero-copy view of the cells, with shape (n_rows, n_cols)."""
+        return np.ndarray(shape=self.shape, dtype=np.uint8, buffer=self.data, strides=(self.stride, 1))
+
+    def index(self, i: int, j: int) -> int:
+        return i * self.stride + j
+
+    def position(self, index: int) -> tuple[int, int]:
+        return divmod(index, self.stride)
+
+    def get(self, index: int) -> int:
+        return self.data[index]
+
+    def __getitem__(self, pos: tuple[int, int]) -> str:
+        return chr(self.data[pos[0] * self.stride + pos[1]])
+
+    def __setitem__(self, pos: tuple[int, int], symbol: str) -> None:
+        self.data[pos[0] * self.stride + pos[1]] = ord(symbol)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Grid):
+            return False
+        return self.shape == other.shape and all(self.row(i) == other.row(i) for i in range(self.n_rows))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __str__(self) -> str:
+        return "\n".join(row.decode("utf-8") for row in self.rows())
+
+    def contains(self, i: int, j: int) -> bool:
+        return 0 <= i < self.n_rows and 0 <= j < self.n_cols
+
+    def row(self, i: int) -> bytes:
+        return bytes(self.data[i * self.stride : i * self.stride + self.n_cols])
+
+    def col(self, j: int) -> bytes:
+        return self.array[:, j].tobytes()
+
+    def set_row(self, i: int, row: bytes) -> None:
+        self.data[i * self.stride : i * self.stride + self.n_cols] = row
+
+    def set_col(self, j: int, col: bytes) -> None:
+        self.array[:, j] = np.frombuffer(col, dtype=np.uint8)
+
+    def rows(self) -> Iterator[bytes]:
+        for i in range(self.n_rows):
+            yield self.row(i)
+
+    def cols(self) -> Iterator[bytes]:
+        for j in range(self.n_cols):
+            yield self.col(j)
+
+    def find(self, symbol: str) -> Optional[tuple[int, int]]:
+        for i in range(self.n_rows):
+            if (j := self.row(i).find(symbol.encode("utf-8"))) != -1:
+                return i, j
+        return None
+
+    def neighbours(self, i: int, j: int, diagonal: bool = False) -> Iterator[tuple[int, int]]:
+        for d_i, d_j in ORTHOGONAL + DIAGONAL if diagonal else ORTHOGONAL:
+            if self.contains(i + d_i, j + d_j):
+                yield i + d_i, j + d_j
+
+    def neighbour_offsets(self, diagonal: bool = False) -> list[int]:
+        """Offsets of the neighbours of a cell in the buffer, only safe without bounds checks on a padded grid."""
+        return [d_i * self.stride + d_j for d_i, d_j in (ORTHOGONAL + DIAGONAL if diagonal else ORTHOGONAL)]
+
+    def copy(self) -> Self:
+        return type(self).from_array(self.array)
+
+    def transposed(self) -> Self:
+        return type(self).from_array(self.array.T)
+
+    def rotated(self, k: int = 1) -> Self:
+        """Rotate clockwise k times."""
+        return type(self).from_array(np.rot90(self.array, -k))
+
+    def padded(self, sentinel: str, width: int = 1) -> Self:
+        """Surround the grid with sentinel cells, so that neighbours can be visited without bounds checks.
+
+        Cell (i, j) of the original grid is cell (i + width, j + width) of the padded one.
+        """
+        return type(self).from_array(np.pad(self.array, width, constant_values=ord(sentinel)))
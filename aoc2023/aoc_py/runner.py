@@ -0,0 +1,220 @@
+import importlib
+import json
+import math
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from aoc_py.utils import InputSource
+
+DAYS = range(1, 16)
+PHASES = ("parse", "part1", "part2")
+
+# Days whose second part lives in its own script
+PART2_MODULES = {1: "aoc12", 2: "aoc22"}
+# Optional functions of a day solving it straight from the raw input, without parsing it, each timed as a phase
+RAW_PHASES = ("bulk_part1", "stream_solve")
+
+
+@dataclass(frozen=True, slots=True)
+class Day:
+    number: int
+    parse: Callable[[InputSource], Any]
+    part1: Callable[[Any], Any]
+    part2: Callable[[Any], Any]
+    # Phases run on the raw input, see RAW_PHASES
+    raw_phases: dict[str, Callable[[InputSource], Any]] = field(default_factory=dict)
+
+
+def load_day(day: int) -> Day:
+    if day not in DAYS:
+        raise ValueError(f"Day {day} is not available, expected one of {list(DAYS)}.")
+
+    module = importlib.import_module(f"aoc_py.aoc{day}.aoc{day}")
+    part2_module = importlib.import_module(f"aoc_py.aoc{day}.{PART2_MODULES[day]}") if day in PART2_MODULES else module
+    return Day(
+        number=day,
+        parse=module.parse,
+        part1=module.part1,
+        part2=part2_module.part2,
+        raw_phases={phase: getattr(module, phase) for phase in RAW_PHASES if hasattr(module, phase)},
+    )
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Nearest-rank percentile, q in [0, 1]."""
+    ordered = sorted(samples)
+    return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
+
+
+@dataclass(slots=True)
+class PhaseTiming:
+    phase: str
+    samples: list[float] = field(default_factory=list)
+    result: Optional[Any] = None
+
+    @property
+    def min(self) -> float:
+        return min(self.samples)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.samples)
+
+    @property
+    def p95(self) -> float:
+        return percentile(self.samples, 0.95)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "phase": self.phase,
+            "repeat": len(self.samples),
+            "min": self.min,
+            "median": self.median,
+            "p95": self.p95,
+            "result": self.result,
+        }
+
+
+def time_day(day: Day, source: InputSource, repeat: int = 1) -> list[PhaseTiming]:
+    """Time each phase of a day separately.
+
+    Every repetition parses the input again, then both parts run on the freshly parsed data.
+    Days with raw phases (bulk_part1, stream_solve) are also timed solving them from the raw input.
+
+    Args:
+        day (Day): the day to run.
+        source (InputSource): a path to the input file or its raw content.
+        repeat (int): number of repetitions.
+
+    Returns:
+        list[PhaseTiming]: timings for parse, part1, part2 and the raw phases of the day.
+    """
+    if repeat < 1:
+        raise ValueError(f"repeat must be at least 1, got {repeat}.")
+
+    phases = PHASES + tuple(day.raw_phases)
+    timings = {phase: PhaseTiming(phase=phase) for phase in phases}
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        parsed = day.parse(source)
+        timings["parse"].samples.append(time.perf_counter() - t0)
+
+        for phase, fn in (("part1", day.part1), ("part2", day.part2)):
+            t0 = time.perf_counter()
+            result = fn(parsed)
+            timings[phase].samples.append(time.perf_counter() - t0)
+            timings[phase].result = result
+
+        for phase, raw_fn in day.raw_phases.items():
+            t0 = time.perf_counter()
+            result = raw_fn(source)
+            timings[phase].samples.append(time.perf_counter() - t0)
+            timings[phase].result = result
+
+    return list(timings.values())
+
+
+@dataclass(frozen=True, slots=True)
+class PhaseMemory:
+    phase: str
+    peak: int
+    retained: int
+    top_sites: list[tuple[str, int]]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "phase": self.phase,
+            "peak_bytes": self.peak,
+            "retained_bytes": self.retained,
+            "top_sites": [{"site": site, "bytes": size} for site, size in self.top_sites],
+        }
+
+
+def _traced_call(phase: str, fn: Callable[[], Any], top: int) -> tuple[Any, PhaseMemory]:
+    # Ignore the memory used by the tracing itself
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    before = tracemalloc.take_snapshot().filter_traces(ignore)
+    tracemalloc.reset_peak()
+    current_before, _ = tracemalloc.get_traced_memory()
+
+    result = fn()
+
+    current_after, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot().filter_traces(ignore)
+    # Sites are sorted by absolute difference, keep the top ones among those that grew
+    grown = [stat for stat in after.compare_to(before, "lineno") if stat.size_diff > 0]
+    top_sites = [(f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", stat.size_diff) for stat in grown[:top]]
+    memory = PhaseMemory(
+        phase=phase, peak=peak - current_before, retained=current_after - current_before, top_sites=top_sites
+    )
+    return result, memory
+
+
+def trace_day(day: Day, source: InputSource, top: int = 5) -> list[PhaseMemory]:
+    """Measure the memory allocated by each phase of a day with tracemalloc.
+
+    For each phase reports the peak of the memory allocated while running it, the memory still allocated once it
+    returned (the parsed input, for the parse phase) and the source lines that retained the most memory.
+
+    Args:
+        day (Day): the day to run.
+        source (InputSource): a path to the input file or its raw content.
+        top (int): number of allocation sites reported for each phase.
+
+    Returns:
+        list[PhaseMemory]: memory usage of parse, part1, part2 and the raw phases of the day.
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        parsed, parse_memory = _traced_call("parse", lambda: day.parse(source), top)
+        _, part1_memory = _traced_call("part1", lambda: day.part1(parsed), top)
+        _, part2_memory = _traced_call("part2", lambda: day.part2(parsed), top)
+        memory = [parse_memory, part1_memory, part2_memory]
+        for phase, raw_fn in day.raw_phases.items():
+            memory.append(_traced_call(phase, lambda: raw_fn(source), top)[1])
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return memory
+
+
+def format_bytes(n_bytes: int) -> str:
+    size = float(n_bytes)
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def format_memory(day: int, memory: list[PhaseMemory], as_json: bool = False) -> str:
+    if as_json:
+        return "\n".join(json.dumps({"day": day, **phase_memory.to_dict()}) for phase_memory in memory)
+
+    lines = [f"Day {day} memory"]
+    for phase_memory in memory:
+        lines.append(
+            f"  {phase_memory.phase:<12} peak={format_bytes(phase_memory.peak)} "
+            f"retained={format_bytes(phase_memory.retained)}"
+        )
+        for site, size in phase_memory.top_sites:
+            lines.append(f"    {format_bytes(size):>10}  {site}")
+    return "\n".join(lines)
+
+
+def format_timings(day: int, timings: list[PhaseTiming], as_json: bool = False) -> str:
+    if as_json:
+        return "\n".join(json.dumps({"day": day, **timing.to_dict()}) for timing in timings)
+
+    lines = [f"Day {day} ({len(timings[0].samples)} runs)"]
+    for timing in timings:
+        line = f"  {timing.phase:<12} min={timing.min:.5f}s median={timing.median:.5f}s p95={timing.p95:.5f}s"
+        if timing.result is not None:
+            line += f" result={timing.result}"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,34 @@
+import io
+import os
+from typing import Iterator, TypeAlias
+
+InputSource: TypeAlias = str | os.PathLike[str] | bytes
+
+
+def read_input(source: InputSource) -> str:
+    """Read the puzzle input.
+
+    Args:
+        source (InputSource): a path to the input file or its raw content.
+
+    Returns:
+        str: the decoded input.
+    """
+    if isinstance(source, bytes):
+        return source.decode("utf-8")
+    with open(source, mode="r", encoding="utf-8") as f:
+        return f.read()
+
+
+def iter_lines(source: InputSource) -> Iterator[str]:
+    """Lazily yield the lines of the puzzle input, without the line terminators.
+
+    Only the current line is kept in memory when reading from a file.
+    """
+    with io.BytesIO(source) if isinstance(source, bytes) else open(source, mode="rb") as f:
+        for line in io.TextIOWrapper(f, encoding="utf-8"):
+            yield line.rstrip("\r\n")
+
+
+def default_input_path(day: int) -> str:
+    return os.path.join(os.path.dirname(__file__), f"aoc{day}", "in.txt")
@@ -0,0 +1,52 @@
+import argparse
+import json
+import sys
+from typing import Optional, Sequence
+
+from aoc_py.runner import DAYS
+from benchmarks.suite import DEFAULT_BASELINE, DEFAULT_SIZES, find_regressions, load_baseline, run_suite, save_baseline
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Time every day on generated inputs.")
+    parser.add_argument("--days", type=int, nargs="+", default=list(DAYS), choices=DAYS, metavar="DAY")
+    parser.add_argument("--sizes", type=int, nargs="+", help="Override the default sizes of the selected days.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed repetitions for each size.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the input generators.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the medians in the baseline file.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown over the baseline.")
+    parser.add_argument("--json", action="store_true", help="Emit one JSON line per day, size and phase.")
+
+    args = parser.parse_args(argv)
+
+    sizes = {day: tuple(args.sizes) for day in args.days} if args.sizes else DEFAULT_SIZES
+    results = run_suite(args.days, sizes=sizes, repeat=args.repeat, seed=args.seed)
+    for result in results:
+        if args.json:
+            print(json.dumps({"day": result.day, "size": result.size, "phase": result.phase, "median": result.median}))
+        else:
+            print(f"{result.key:<28} median={result.median:.5f}s min={result.min:.5f}s p95={result.p95:.5f}s")
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}.")
+        return 0
+
+    try:
+        baseline = load_baseline(args.baseline)
+    except FileNotFoundError:
+        print(f"No baseline found at {args.baseline}, run with --save-baseline first.")
+        return 0
+
+    regressions = find_regressions(results, baseline, tolerance=args.tolerance)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.key}: {regression.current:.5f}s vs {regression.baseline:.5f}s "
+            f"({regression.ratio:.2f}x)"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+"""Seeded generators of valid puzzle inputs at configurable scale.
+
+Every generator takes a `random.Random` instance and a day specific size, and returns the input as text.
+"""
+
+import random
+import string
+from typing import Callable
+
+DIGIT_WORDS = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine"]
+
+
+def generate_day1(rng: random.Random, size: int) -> str:
+    """1000 calibration lines of `size` characters, each one with at least one digit."""
+    lines = []
+    for _ in range(1000):
+        chunks: list[str] = []
+        length = 0
+        while length < size:
+            roll = rng.random()
+            if roll < 0.1:
+                chunk = rng.choice(string.digits[1:])
+            elif roll < 0.3:
+                chunk = rng.choice(DIGIT_WORDS)
+            else:
+                chunk = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(1, 5)))
+            chunks.append(chunk)
+            length += len(chunk)
+        line = "".join(chunks)[:size]
+        if not any(ch in string.digits for ch in line):
+            idx = rng.randrange(len(line))
+            line = line[:idx] + rng.choice(string.digits[1:]) + line[idx + 1 :]
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def generate_day2(rng: random.Random, size: int) -> str:
+    """`size` games with up to 6 reveals each."""
+    lines = []
+    for game_id in range(1, size + 1):
+        reveals = []
+        for _ in range(rng.randint(1, 6)):
+            colors = rng.sample(["red", "green", "blue"], k=rng.randint(1, 3))
+            reveals.append(", ".join(f"{rng.randint(1, 20)} {color}" for color in colors))
+        lines.append(f"Game {game_id}: {'; '.join(reveals)}")
+    return "\n".join(lines) + "\n"
+
+
+def generate_day3(rng: random.Random, size: int) -> str:
+    """Square schematic with side `size`."""
+    symbols = "*#+$/=%@&-"
+    rows = []
+    for _ in range(size):
+        row: list[str] = []
+        while len(row) < size:
+            roll = rng.random()
+            if roll < 0.15:
+                row.extend(str(rng.randint(1, 999)))
+                row.append(".")
+            elif roll < 0.22:
+                row.append(rng.choice(symbols))
+            else:
+                row.append(".")
+        rows.append("".join(row[:size]))
+    return "\n".join(rows) + "\n"
+
+
+def generate_day4(rng: random.Random, size: int) -> str:
+    """`size` scratchcards with 10 winning numbers and 25 numbers each.
+
+    Matches are kept low on average so that the number of won copies stays bounded.
+    """
+    lines = []
+    for card_num in range(1, size + 1):
+        n_matches = min(rng.choice([0, 0, 0, 0, 1, 1, 2, 3, 4, 5]), size - card_num)
+        numbers = rng.sample(range(1, 100), k=10 + 25 - n_matches)
+        winning = numbers[:10]
+        nums = winning[:n_matches] + numbers[10:]
+        rng.shuffle(nums)
+        lines.append(
+            f"Card {card_num:>3}: {' '.join(f'{x:>2}' for x in winning)} | {' '.join(f'{x:>2}' for x in nums)}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def generate_day5(rng: random.Random, size: int) -> str:
+    """`size` seed ranges and `size` intervals in each of the seven maps."""
+    upper = 2**32
+    seeds = []
+    for _ in range(size):
+        start = rng.randrange(upper)
+        seeds.extend([start, rng.randint(1, min(10**8, upper - start))])
+
+    names = ["seed", "soil", "fertilizer", "water", "light", "temperature", "humidity", "location"]
+    blocks = [f"seeds: {' '.join(str(x) for x in seeds)}"]
+    for source_name, dest_name in zip(names, names[1:]):
+        breakpoints = sorted(rng.sample(range(1, upper), k=size))
+        lines = []
+        for start, end in zip([0] + breakpoints, breakpoints + [upper]):
+            if rng.random() < 0.1:
+                # Leave a gap, mapped to itself
+                continue
+            lines.append(f"{rng.randrange(upper - (end - start))} {start} {end - start}")
+        if not lines:
+            lines.append(f"0 0 {upper}")
+        blocks.append(f"{source_name}-to-{dest_name} map:\n" + "\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+def generate_day6(rng: random.Random, size: int) -> str:
+    """`size` races, every one of them (and their concatenation) can be won."""
+    times = [rng.randint(50, 99) for _ in range(size)]
+    distances = [rng.randint(100, time**2 // 4 - 1) for time in times]
+    return f"Time: {' '.join(str(x) for x in times)}\nDistance: {' '.join(str(x) for x in distances)}\n"
+
+
+def generate_day7(rng: random.Random, size: int) -> str:
+    """`size` distinct hands (at most 13^5)."""
+    symbols = "23456789TJQKA"
+    lines = []
+    for code in rng.sample(range(len(symbols) ** 5), k=size):
+        hand = ""
+        for _ in range(5):
+            code, idx = divmod(code, len(symbols))
+            hand += symbols[idx]
+        lines.append(f"{hand} {rng.randint(1, 1000)}")
+    return "\n".join(lines) + "\n"
+
+
+def generate_day8(rng: random.Random, size: int) -> str:
+    """Instructions of length `size` and six ghosts.
+
+    Each ghost walks through pairs of nodes (one reached going left, one going right) and reaches its Z node
+    after a prime multiple of the instructions length, then loops back, as in the puzzle input.
+    """
+    instructions = "".join(rng.choice("LR") for _ in range(size))
+    lines = []
+    for ghost, prime in enumerate(rng.sample([43, 47, 53, 59, 61, 67, 71, 73, 79], k=6)):
+        start, target = ("AAA", "ZZZ") if ghost == 0 else (f"g{ghost}A", f"g{ghost}Z")
+        cycle_len = prime * size
+        layers = [(f"g{ghost}n{i}x0", f"g{ghost}n{i}x1") for i in range(1, cycle_len)]
+        lines.append(f"{start} = ({layers[0][0]}, {layers[0][1]})")
+        lines.append(f"{target} = ({layers[0][0]}, {layers[0][1]})")
+        for layer, next_layer in zip(layers, layers[1:] + [(target, target)]):
+            for name in layer:
+                lines.append(f"{name} = ({next_layer[0]}, {next_layer[1]})")
+    rng.shuffle(lines)
+    return instructions + "\n\n" + "\n".join(lines)
+
+
+def generate_day9(rng: random.Random, size: int) -> str:
+    """`size` histories of 21 values, each sampled from a polynomial of degree up to 8."""
+    lines = []
+    for _ in range(size):
+        coefficients = [rng.randint(-9, 9) for _ in range(rng.randint(1, 9))]
+        values = [sum(c * x**i for i, c in enumerate(coefficients)) for x in range(21)]
+        lines.append(" ".join(str(v) for v in values))
+    return "\n".join(lines) + "\n"
+
+
+def generate_day10(rng: random.Random, size: int) -> str:
+    """Square pipe maze with side about `size`.
+
+    The loop is the contour of a random spanning tree grown over a random region of a coarse grid,
+    it is drawn with a blank tile between non consecutive pipes and it may enclose holes.
+    """
+    k = max(2, (size + 1) // 4)
+    target = max(2, int(k * k * 0.6))
+    tree: dict[tuple[int, int], set[tuple[int, int]]] = {(k // 2, k // 2): set()}
+    frontier = [((k // 2, k // 2), n) for n in _neighbours((k // 2, k // 2), k)]
+    while frontier and len(tree) < target:
+        a, b = frontier.pop(rng.randrange(len(frontier)))
+        if b in tree:
+            continue
+        tree[a].add(b)
+        tree[b] = {a}
+        frontier.extend((b, n) for n in _neighbours(b, k) if n not in tree)
+
+    # Hamiltonian cycle over the 2k x 2k fine cells covered by the tree
+    links: dict[tuple[int, int], set[tuple[int, int]]] = {}
+    for r, c in tree:
+        tl, tr, bl, br = (2 * r, 2 * c), (2 * r, 2 * c + 1), (2 * r + 1, 2 * c), (2 * r + 1, 2 * c + 1)
+        for a, b in [(tl, tr), (tr, br), (br, bl), (bl, tl)]:
+            links.setdefault(a, set()).add(b)
+            links.setdefault(b, set()).add(a)
+    for r, c in tree:
+        for nr, nc in tree[(r, c)]:
+            if (nr, nc) == (r + 1, c):
+                pairs = [((2 * r + 1, 2 * c), (2 * r + 1, 2 * c + 1)), ((2 * r + 2, 2 * c), (2 * r + 2, 2 * c + 1))]
+                bridges = [((2 * r + 1, 2 * c), (2 * r + 2, 2 * c)), ((2 * r + 1, 2 * c + 1), (2 * r + 2, 2 * c + 1))]
+            elif (nr, nc) == (r, c + 1):
+                pairs = [((2 * r, 2 * c + 1), (2 * r + 1, 2 * c + 1)), ((2 * r, 2 * c + 2), (2 * r + 1, 2 * c + 2))]
+                bridges = [((2 * r, 2 * c + 1), (2 * r, 2 * c + 2)), ((2 * r + 1, 2 * c + 1), (2 * r + 1, 2 * c + 2))]
+            else:
+                continue
+            for a, b in pairs:
+                links[a].discard(b)
+                links[b].discard(a)
+            for a, b in bridges:
+                links[a].add(b)
+                links[b].add(a)
+
+    # Draw the cycle scaled by 2, so that only consecutive pipes touch each other
+    side = 4 * k - 1
+    tiles = [["."] * side for _ in range(side)]
+    symbols = {
+        frozenset({(-1, 0), (1, 0)}): "|",
+        frozenset({(0, -1), (0, 1)}): "-",
+        frozenset({(-1, 0), (0, 1)}): "L",
+        frozenset({(-1, 0), (0, -1)}): "J",
+        frozenset({(1, 0), (0, -1)}): "7",
+        frozenset({(1, 0), (0, 1)}): "F",
+    }
+    for (r, c), linked in links.items():
+        deltas = frozenset((nr - r, nc - c) for nr, nc in linked)
+        tiles[2 * r][2 * c] = symbols[deltas]
+        for dr, dc in deltas:
+            tiles[2 * r + dr][2 * c + dc] = "|" if dr else "-"
+    start = rng.choice(list(links))
+    tiles[2 * start[0]][2 * start[1]] = "S"
+    return "\n".join("".join(row) for row in tiles) + "\n"
+
+
+def _neighbours(cell: tuple[int, int], k: int) -> list[tuple[int, int]]:
+    r, c = cell
+    return [(r + dr, c + dc) for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)] if 0 <= r + dr < k and 0 <= c + dc < k]
+
+
+def generate_day11(rng: random.Random, size: int) -> str:
+    """Square image with side `size`, about 3% of the tiles are galaxies and some rows and columns are empty."""
+    empty_rows = set(rng.sample(range(size), k=size // 10))
+    empty_cols = set(rng.sample(range(size), k=size // 10))
+    rows = []
+    for i in range(size):
+        rows.append(
+            "".join(
+                "#" if i not in empty_rows and j not in empty_cols and rng.random() < 0.03 else "." for j in range(size)
+            )
+        )
+    return "\n".join(rows) + "\n"
+
+
+def generate_day12(rng: random.Random, size: int) -> str:
+    """200 spring records of length `size`, about a third of the springs are unknown."""
+    lines = []
+    for _ in range(200):
+        springs = [rng.choice(".#") for _ in range(size)]
+        if "#" not in springs:
+            springs[rng.randrange(size)] = "#"
+        groups = [len(g) for g in "".join(springs).split(".") if g]
+        record = "".join("?" if rng.random() < 0.35 else ch for ch in springs)
+        lines.append(f"{record} {','.join(str(g) for g in groups)}")
+    return "\n".join(lines) + "\n"
+
+
+def generate_day13(rng: random.Random, size: int) -> str:
+    """`size` patterns, each one with a row reflection and a column reflection off by a single smudge."""
+    patterns = []
+    for _ in range(size):
+        n_rows, n_cols = rng.randint(9, 17), rng.randint(5, 17)
+        row_line, col_line = rng.randint(1, 2), rng.randint(1, n_cols - 1)
+        pattern = [[rng.choice("#.") for _ in range(n_cols)] for _ in range(n_rows)]
+        for row in pattern:
+            for j in range(min(col_line, n_cols - col_line)):
+                row[col_line + j] = row[col_line - 1 - j]
+        for i in range(row_line):
+            pattern[row_line + i] = list(pattern[row_line - 1 - i])
+        # The smudge sits in a row not covered by the row reflection
+        smudge_row = rng.randrange(2 * row_line, n_rows)
+        smudge_col = rng.randrange(col_line - min(col_line, n_cols - col_line), col_line)
+        pattern[smudge_row][smudge_col] = "#" if pattern[smudge_row][smudge_col] == "." else "."
+        patterns.append("\n".join("".join(row) for row in pattern))
+    return "\n\n".join(patterns)
+
+
+def generate_day14(rng: random.Random, size: int) -> str:
+    """Square platform with side `size`."""
+    rows = ["".join(rng.choices("O#.", weights=[2, 1, 5], k=size)) for _ in range(size)]
+    return "\n".join(rows) + "\n"
+
+
+def generate_day15(rng: random.Random, size: int) -> str:
+    """`size` initialization steps over 500 labels."""
+    labels = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 6))) for _ in range(500)]
+    steps = []
+    for _ in range(size):
+        label = rng.choice(labels)
+        steps.append(f"{label}-" if rng.random() < 0.3 else f"{label}={rng.randint(1, 9)}")
+    return ",".join(steps)
+
+
+GENERATORS: dict[int, Callable[[random.Random, int], str]] = {
+    1: generate_day1,
+    2: generate_day2,
+    3: generate_day3,
+    4: generate_day4,
+    5: generate_day5,
+    6: generate_day6,
+    7: generate_day7,
+    8: generate_day8,
+    9: generate_day9,
+    10: generate_day10,
+    11: generate_day11,
+    12: generate_day12,
+    13: generate_day13,
+    14: generate_day14,
+    15: generate_day15,
+}
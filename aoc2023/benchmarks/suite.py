@@ -0,0 +1,112 @@
+import json
+import os
+import random
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from aoc_py.runner import load_day, time_day
+from benchmarks.generators import GENERATORS
+
+# Sizes are day specific, see the generators docstrings
+DEFAULT_SIZES: dict[int, tuple[int, ...]] = {
+    1: (100, 1_000, 10_000),
+    2: (1_000, 10_000, 100_000),
+    3: (50, 200, 800),
+    4: (1_000, 10_000, 100_000),
+    5: (10, 50, 200),
+    6: (4, 8, 16),
+    7: (1_000, 10_000, 100_000),
+    8: (10, 50, 200),
+    9: (1_000, 10_000, 50_000),
+    10: (20, 60, 120),
+    11: (20, 50, 100),
+    12: (6, 10, 14),
+    13: (100, 1_000, 5_000),
+    14: (10, 25, 50),
+    15: (1_000, 10_000, 100_000),
+}
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+@dataclass(frozen=True, slots=True)
+class BenchmarkResult:
+    day: int
+    size: int
+    phase: str
+    median: float
+    min: float
+    p95: float
+
+    @property
+    def key(self) -> str:
+        return f"day{self.day}/size={self.size}/{self.phase}"
+
+
+@dataclass(frozen=True, slots=True)
+class Regression:
+    key: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+
+def run_suite(
+    days: Iterable[int], sizes: dict[int, tuple[int, ...]] = DEFAULT_SIZES, repeat: int = 3, seed: int = 0
+) -> list[BenchmarkResult]:
+    results = []
+    for day_number in days:
+        day = load_day(day_number)
+        for size in sizes[day_number]:
+            # The same seed always produces the same input, so runs are comparable with the baseline
+            source = GENERATORS[day_number](random.Random(f"{seed}-{day_number}-{size}"), size).encode("utf-8")
+            for timing in time_day(day, source, repeat=repeat):
+                results.append(
+                    BenchmarkResult(
+                        day=day_number,
+                        size=size,
+                        phase=timing.phase,
+                        median=timing.median,
+                        min=timing.min,
+                        p95=timing.p95,
+                    )
+                )
+    return results
+
+
+def save_baseline(results: list[BenchmarkResult], path: str = DEFAULT_BASELINE) -> None:
+    baseline: dict[str, Any] = {}
+    if os.path.exists(path):
+        baseline = load_baseline(path)
+    baseline.update({result.key: result.median for result in results})
+    with open(path, mode="w", encoding="utf-8") as f:
+        json.dump(dict(sorted(baseline.items())), f, indent=2)
+        f.write("\n")
+
+
+def load_baseline(path: str = DEFAULT_BASELINE) -> dict[str, float]:
+    with open(path, mode="r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def find_regressions(
+    results: list[BenchmarkResult], baseline: dict[str, float], tolerance: float, min_seconds: float = 1e-3
+) -> list[Regression]:
+    """Compare median timings with the baseline.
+
+    A phase regresses when it is slower than the baseline by more than `tolerance` (0.2 means 20%).
+    Phases faster than `min_seconds` in both runs are ignored, they are dominated by noise.
+    """
+    regressions = []
+    for result in results:
+        if result.key not in baseline:
+            continue
+        reference = baseline[result.key]
+        if max(reference, result.median) < min_seconds:
+            continue
+        if result.median > reference * (1 + tolerance):
+            regressions.append(Regression(key=result.key, baseline=reference, current=result.median))
+    return regressions
@@ -0,0 +1,36 @@
+import pathlib
+
+import pytest
+
+from aoc_py.aoc3.aoc3 import compute_first_part_solution, parse, part1, part2, stream_schematic, stream_solve
+
+EXAMPLE = """467..114..
+...*......
+..35..633.
+......#...
+617*......
+.....+.58.
+..592.....
+......755.
+...$.*....
+.664.598..
+"""
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_stream_solve_reads_files(tmp_path: pathlib.Path, newline: str) -> None:
+    path = tmp_path / "in.txt"
+    path.write_bytes(EXAMPLE.replace("\n", newline).encode("utf-8"))
+
+    grid = parse(path)
+    assert stream_solve(path) == (part1(grid), part2(grid)) == (4361, 467835)
+
+
+def test_stream_schematic_ignores_line_terminators(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "in.txt"
+    # 12 ends right before the line terminators, which are not symbols
+    path.write_text("467.\n..12\n....\n", encoding="utf-8")
+
+    with open(path, encoding="utf-8", newline="") as f:
+        first_part_sum = sum(compute_first_part_solution(grid_numbers) for grid_numbers, _ in stream_schematic(f))
+    assert first_part_sum == 0
@@ -0,0 +1,37 @@
+import random
+import time
+
+import numpy as np
+
+from aoc_py.aoc5.aoc5 import AlmanacIndex, parse
+from benchmarks.generators import GENERATORS
+
+
+def build_time(size: int) -> float:
+    """Best time of a few builds of the index, on an input with size intervals in each map."""
+    almanac = parse(GENERATORS[5](random.Random(size), size).encode("utf-8"))
+    timings = []
+    for _ in range(3):
+        t0 = time.perf_counter()
+        AlmanacIndex.from_maps(almanac.cascade_maps)
+        timings.append(time.perf_counter() - t0)
+    return min(timings)
+
+
+def test_index_matches_maps_on_large_input() -> None:
+    almanac = parse(GENERATORS[5](random.Random(0), 2_000).encode("utf-8"))
+    index = AlmanacIndex.from_maps(almanac.cascade_maps)
+
+    seeds = np.array(random.Random(1).sample(range(2**32), k=1_000), dtype=np.int64)
+    expected = []
+    for seed in seeds.tolist():
+        for mapping in almanac.cascade_maps:
+            (_, _, offset), *_ = mapping.split(seed, seed + 1)
+            seed += offset
+        expected.append(seed)
+    assert index.lookup(seeds).tolist() == expected
+
+
+def test_index_build_scales_linearly() -> None:
+    # Four times more intervals, a quadratic build would be about 16 times slower
+    assert build_time(4_000) < 8 * build_time(1_000)